@@ -13,7 +13,9 @@ __author__ = "Jacobo Tlacaelel Mina Rodriguez"
 # Core components
 from .core.datatypes import (
     FirmaRadiactiva,
+    FirmaRadiactivaArray,
     EstadoCuantico,
+    EstadoCuanticoArray,
     TipoDecaimiento,
     PaqueteBiMoType,
     RADIOACTIVE_ISOTOPES
@@ -36,7 +38,9 @@ from .codegen.c_generator import TernaryBiMoTypeCodegen
 __all__ = [
     # Core
     'FirmaRadiactiva',
+    'FirmaRadiactivaArray',
     'EstadoCuantico',
+    'EstadoCuanticoArray',
     'TipoDecaimiento',
     'PaqueteBiMoType',
     'RADIOACTIVE_ISOTOPES',
@@ -8,14 +8,7 @@ Generates C header for embedded systems.
 Author: Jacobo Tlacaelel Mina Rodriguez
 """
 
-class TernaryBiMoTypeCodegen:
-    """Genera código C para Smopsys"""
-    
-    @staticmethod
-    def generate_header() -> str:
-        """Genera ternary_bimotype.h"""
-        
-        code = """/*
+_HEADER_CODE = """/*
  * ternary_bimotype.h - Integración Ternary + BiMoType
  * Smopsys Q-CORE
  * 
@@ -26,8 +19,18 @@ class TernaryBiMoTypeCodegen:
 #define TERNARY_BIMOTYPE_H
 
 #include <stdint.h>
+#include <stddef.h>
+#include <string.h>
 #include <math.h>
 
+#ifdef __SSSE3__
+#include <tmmintrin.h>
+#endif
+
+#ifdef __AVX2__
+#include <immintrin.h>
+#endif
+
 /* ============================================================
  * TIPOS DE DECAIMIENTO RADIACTIVO
  * ============================================================ */
@@ -55,13 +58,11 @@ typedef struct {
  * FIRMA RADIACTIVA TOPOLÓGICA
  * ============================================================ */
 
+// Campos ordenados de mayor a menor alineación (sin huecos internos)
 typedef struct {
-    // Datos topológicos
-    TopologicalState topology;
+    const char *isotope;
     
     // Datos radiactivos
-    const char *isotope;
-    DecayType decay_type;
     float energy_peak_ev;
     float half_life_s;
     float nuclear_spin;
@@ -72,45 +73,65 @@ typedef struct {
     float mg_polarity;
     float quantum_phase;
     
+    DecayType decay_type;
+    
     // Empaquetamiento
     uint16_t packed_topology;
-    char hex_encoding[5];  // "XXXX\0"
+    
+    // Datos topológicos
+    TopologicalState topology;
+    
+    char hex_encoding[5];  // "XXXX\\0"
 } TernaryRadioactiveSignature;
 
 /* ============================================================
  * MAPEO TERNARIO → DECAIMIENTO
  * ============================================================ */
 
+// Tablas sin ramas: índice (peso_ternario + 1) & 3 y DecayType & 3
+static const DecayType _decay_lut[4] = {
+    DECAY_BETA, DECAY_GAMMA, DECAY_ALPHA, DECAY_GAMMA
+};
+
+static const char *const _iso_lut[4] = {
+    "Sr90", "Tc99m", "Pu238", "Tc99m"
+};
+
+static const float _energy_base_lut[4] = {
+    546000.0f, 140000.0f, 5590000.0f, 140000.0f
+};
+
+static const float _half_life_lut[4] = {
+    28.8f * 3.154e7f, 0.25f * 3.154e7f, 87.7f * 3.154e7f, 0.25f * 3.154e7f
+};
+
+static const float _spin_lut[4] = {
+    0.0f, 4.5f, 0.0f, 4.5f
+};
+
 static inline DecayType ternary_to_decay_type(int8_t peso_ternario) {
-    switch (peso_ternario) {
-        case -1: return DECAY_BETA;
-        case  0: return DECAY_GAMMA;
-        case  1: return DECAY_ALPHA;
-        default: return DECAY_GAMMA;
-    }
+    return _decay_lut[(uint8_t)(peso_ternario + 1) & 3];
 }
 
 static inline const char* decay_type_to_isotope(DecayType type) {
-    switch (type) {
-        case DECAY_BETA:  return "Sr90";
-        case DECAY_GAMMA: return "Tc99m";
-        case DECAY_ALPHA: return "Pu238";
-        default: return "Tc99m";
-    }
+    return _iso_lut[(unsigned)type & 3];
 }
 
 /* ============================================================
  * CONVERSIÓN H7 → FASE CUÁNTICA
  * ============================================================ */
 
+// 2π/7 precalculado: una multiplicación en lugar de división
+static const float H7_SCALE = 6.28318530717958647692f / 7.0f;
+
 static inline float h7_index_to_phase(uint8_t h7_index) {
     // 0-7 → 0-2π
-    return ((float)h7_index / 7.0f) * 2.0f * 3.14159265f;
+    return (float)h7_index * H7_SCALE;
 }
 
 static inline float chirality_to_mg_polarity(float chirality_index) {
     // -1 a +1 → 0 a 1
-    return (chirality_index + 1.0f) / 2.0f;
+    return chirality_index * 0.5f + 0.5f;
 }
 
 /* ============================================================
@@ -118,23 +139,69 @@ static inline float chirality_to_mg_polarity(float chirality_index) {
  * ============================================================ */
 
 static inline uint16_t topology_pack(const TopologicalState *topo) {
-    uint16_t packed = 0;
-    
-    // Codificar winding: 0 → 0, 2 → 1
-    uint8_t winding_encoded = topo->winding / 2;
-    
-    // Codificar peso_ternario: -1 → 0, 0 → 1, +1 → 2
-    uint8_t peso_encoded = topo->peso_ternario + 1;
-    
-    // Empaquetar (big-endian)
-    packed |= (topo->indice & 0x7) << 13;
-    packed |= (topo->pareja & 0x7) << 10;
-    packed |= (winding_encoded & 0x3) << 8;
-    packed |= (topo->mapeo & 0x1) << 7;
-    packed |= (peso_encoded & 0x3) << 5;
-    packed |= (topo->fase_discreta_fragmento & 0x1F);
-    
-    return packed;
+    // Empaquetar (big-endian) en una sola expresión
+    // winding: 0 → 0, 2 → 1; peso_ternario: -1 → 0, 0 → 1, +1 → 2
+    return (uint16_t)(
+        ((uint32_t)(topo->indice & 0x7) << 13) |
+        ((uint32_t)(topo->pareja & 0x7) << 10) |
+        ((uint32_t)((topo->winding >> 1) & 0x3) << 8) |
+        ((uint32_t)(topo->mapeo & 0x1) << 7) |
+        ((uint32_t)((topo->peso_ternario + 1) & 0x3) << 5) |
+        (uint32_t)(topo->fase_discreta_fragmento & 0x1F)
+    );
+}
+
+/*
+ * Empaquetamiento por lotes sobre columnas (SoA): un arreglo por campo.
+ * Con AVX2 se empaquetan 16 estados por iteración en un __m256i.
+ */
+static inline void topology_pack_soa(
+    const uint8_t *indice,
+    const uint8_t *pareja,
+    const uint8_t *winding,
+    const uint8_t *mapeo,
+    const int8_t *peso,
+    const uint8_t *fase,
+    uint16_t *out,
+    size_t n
+) {
+    size_t i = 0;
+
+#ifdef __AVX2__
+    const __m256i mask3 = _mm256_set1_epi16(0x7);
+    const __m256i mask1 = _mm256_set1_epi16(0x1);
+    const __m256i mask5 = _mm256_set1_epi16(0x1F);
+    const __m256i one = _mm256_set1_epi16(1);
+
+    for (; i + 16 <= n; i += 16) {
+        __m256i v_indice  = _mm256_cvtepu8_epi16(_mm_loadu_si128((const __m128i *)(indice + i)));
+        __m256i v_pareja  = _mm256_cvtepu8_epi16(_mm_loadu_si128((const __m128i *)(pareja + i)));
+        __m256i v_winding = _mm256_cvtepu8_epi16(_mm_loadu_si128((const __m128i *)(winding + i)));
+        __m256i v_mapeo   = _mm256_cvtepu8_epi16(_mm_loadu_si128((const __m128i *)(mapeo + i)));
+        __m256i v_peso    = _mm256_cvtepi8_epi16(_mm_loadu_si128((const __m128i *)(peso + i)));
+        __m256i v_fase    = _mm256_cvtepu8_epi16(_mm_loadu_si128((const __m128i *)(fase + i)));
+
+        // winding: 0 → 0, 2 → 1 ; peso_ternario: -1 → 0, 0 → 1, +1 → 2
+        __m256i winding_encoded = _mm256_srli_epi16(v_winding, 1);
+        __m256i peso_encoded = _mm256_add_epi16(v_peso, one);
+
+        __m256i packed = _mm256_slli_epi16(_mm256_and_si256(v_indice, mask3), 13);
+        packed = _mm256_or_si256(packed, _mm256_slli_epi16(_mm256_and_si256(v_pareja, mask3), 10));
+        packed = _mm256_or_si256(packed, _mm256_slli_epi16(_mm256_and_si256(winding_encoded, _mm256_set1_epi16(0x3)), 8));
+        packed = _mm256_or_si256(packed, _mm256_slli_epi16(_mm256_and_si256(v_mapeo, mask1), 7));
+        packed = _mm256_or_si256(packed, _mm256_slli_epi16(_mm256_and_si256(peso_encoded, _mm256_set1_epi16(0x3)), 5));
+        packed = _mm256_or_si256(packed, _mm256_and_si256(v_fase, mask5));
+
+        _mm256_storeu_si256((__m256i *)(out + i), packed);
+    }
+#endif
+
+    for (; i < n; i++) {
+        TopologicalState topo = {
+            indice[i], pareja[i], winding[i], mapeo[i], peso[i], fase[i]
+        };
+        out[i] = topology_pack(&topo);
+    }
 }
 
 static inline void topology_to_hex16(uint16_t packed, char *hex_out) {
@@ -147,6 +214,72 @@ static inline void topology_to_hex16(uint16_t packed, char *hex_out) {
     hex_out[4] = '\\0';
 }
 
+/*
+ * SWAR: los 4 nibbles en los 4 bytes de un uint32 (nibble alto en el byte 0)
+ * y conversión a ASCII sin tabla: '0' + n, más 7 si n > 9 ('A' - '0' - 10).
+ * Para objetivos sin SSSE3.
+ */
+static inline uint32_t topology_to_hex16_swar(uint16_t packed) {
+    uint32_t nibbles = ((uint32_t)(packed >> 12) & 0xF)
+                     | (((uint32_t)(packed >> 8) & 0xF) << 8)
+                     | (((uint32_t)(packed >> 4) & 0xF) << 16)
+                     | (((uint32_t)packed & 0xF) << 24);
+    uint32_t over9 = ((nibbles + 0x06060606u) & 0x10101010u) >> 4;
+    return nibbles + 0x30303030u + over9 * 7;
+}
+
+static inline void topology_to_hex16_swar_store(uint16_t packed, char *out) {
+    uint32_t ascii = topology_to_hex16_swar(packed);
+#if defined(__BYTE_ORDER__) && __BYTE_ORDER__ == __ORDER_LITTLE_ENDIAN__
+    memcpy(out, &ascii, 4);
+#else
+    out[0] = (char)(ascii & 0xFF);
+    out[1] = (char)((ascii >> 8) & 0xFF);
+    out[2] = (char)((ascii >> 16) & 0xFF);
+    out[3] = (char)(ascii >> 24);
+#endif
+}
+
+/*
+ * Codificación hex por lotes: n palabras → 4*n caracteres (sin '\\0').
+ * Con SSSE3 se codifican 8 palabras por iteración con pshufb sobre
+ * una LUT nibble→ASCII; el resto se procesa con la versión SWAR.
+ */
+static inline void topology_to_hex16_batch(const uint16_t *packed, char *out, size_t n) {
+    size_t i = 0;
+
+#ifdef __SSSE3__
+    const __m128i lut = _mm_setr_epi8(
+        '0', '1', '2', '3', '4', '5', '6', '7',
+        '8', '9', 'A', 'B', 'C', 'D', 'E', 'F'
+    );
+    // uint16 little-endian → bytes big-endian (byte alto primero)
+    const __m128i bswap16 = _mm_setr_epi8(
+        1, 0, 3, 2, 5, 4, 7, 6, 9, 8, 11, 10, 13, 12, 15, 14
+    );
+    const __m128i nibble_mask = _mm_set1_epi8(0x0F);
+
+    for (; i + 8 <= n; i += 8) {
+        __m128i srcv = _mm_loadu_si128((const __m128i *)(packed + i));
+        srcv = _mm_shuffle_epi8(srcv, bswap16);
+
+        __m128i lo = _mm_and_si128(srcv, nibble_mask);
+        __m128i hi = _mm_and_si128(_mm_srli_epi16(srcv, 4), nibble_mask);
+
+        __m128i hex_lo = _mm_shuffle_epi8(lut, lo);
+        __m128i hex_hi = _mm_shuffle_epi8(lut, hi);
+
+        // Intercalar (hi, lo) por byte: mismo orden que la versión escalar
+        _mm_storeu_si128((__m128i *)(out + 4 * i), _mm_unpacklo_epi8(hex_hi, hex_lo));
+        _mm_storeu_si128((__m128i *)(out + 4 * i + 16), _mm_unpackhi_epi8(hex_hi, hex_lo));
+    }
+#endif
+
+    for (; i < n; i++) {
+        topology_to_hex16_swar_store(packed[i], out + 4 * i);
+    }
+}
+
 /* ============================================================
  * CREAR FIRMA DESDE TOPOLOGÍA
  * ============================================================ */
@@ -168,23 +301,10 @@ static inline void create_radioactive_signature_from_topology(
     // Energía según tipo de decaimiento + winding
     float binding_factor = 1.0f + ((float)topo->winding / 2.0f) * 0.5f;
     
-    switch (sig->decay_type) {
-        case DECAY_BETA:
-            sig->energy_peak_ev = 546000.0f * binding_factor;
-            sig->half_life_s = 28.8f * 3.154e7f;
-            sig->nuclear_spin = 0.0f;
-            break;
-        case DECAY_GAMMA:
-            sig->energy_peak_ev = 140000.0f * binding_factor;
-            sig->half_life_s = 0.25f * 3.154e7f;
-            sig->nuclear_spin = 4.5f;
-            break;
-        case DECAY_ALPHA:
-            sig->energy_peak_ev = 5590000.0f * binding_factor;
-            sig->half_life_s = 87.7f * 3.154e7f;
-            sig->nuclear_spin = 0.0f;
-            break;
-    }
+    unsigned t = (unsigned)sig->decay_type & 3;
+    sig->energy_peak_ev = _energy_base_lut[t] * binding_factor;
+    sig->half_life_s = _half_life_lut[t];
+    sig->nuclear_spin = _spin_lut[t];
     
     // Métricas cuánticas
     sig->mahalanobis_distance = (float)topo->indice / 6.0f;
@@ -196,6 +316,127 @@ static inline void create_radioactive_signature_from_topology(
     topology_to_hex16(sig->packed_topology, sig->hex_encoding);
 }
 
+/* ============================================================
+ * FIRMAS RADIACTIVAS POR LOTES (SoA)
+ * ============================================================ */
+
+typedef struct {
+    const uint8_t *indice;
+    const uint8_t *pareja;
+    const uint8_t *winding;
+    const uint8_t *mapeo;
+    const int8_t *peso_ternario;
+    const uint8_t *fase_discreta_fragmento;
+} TopologicalStateSoA;
+
+typedef struct {
+    float *energy_peak_ev;
+    float *half_life_s;
+    float *nuclear_spin;
+    float *mahalanobis_distance;
+    float *lambda_double_non_locality;
+    float *mg_polarity;
+    float *quantum_phase;
+    uint8_t *decay_type;        // DecayType; isótopo vía decay_type_to_isotope
+    uint16_t *packed_topology;
+} TernaryRadioactiveSignatureSoA;
+
+/*
+ * Versión por lotes de create_radioactive_signature_from_topology.
+ * Con AVX2 todo el cálculo en coma flotante de 8 firmas se hace en una
+ * sola pasada vectorial, con las mismas operaciones que la versión
+ * escalar (resultados idénticos bit a bit).
+ */
+static inline void create_radioactive_signature_batch(
+    const TopologicalStateSoA *in,
+    TernaryRadioactiveSignatureSoA *out,
+    size_t n
+) {
+    size_t i = 0;
+
+#ifdef __AVX2__
+    const __m256i decay_tab = _mm256_setr_epi32(
+        DECAY_BETA, DECAY_GAMMA, DECAY_ALPHA, DECAY_GAMMA, 0, 0, 0, 0
+    );
+    const __m256 energy_tab = _mm256_setr_ps(
+        _energy_base_lut[0], _energy_base_lut[1], _energy_base_lut[2], _energy_base_lut[3], 0.0f, 0.0f, 0.0f, 0.0f
+    );
+    const __m256 half_life_tab = _mm256_setr_ps(
+        _half_life_lut[0], _half_life_lut[1], _half_life_lut[2], _half_life_lut[3], 0.0f, 0.0f, 0.0f, 0.0f
+    );
+    const __m256 spin_tab = _mm256_setr_ps(
+        _spin_lut[0], _spin_lut[1], _spin_lut[2], _spin_lut[3], 0.0f, 0.0f, 0.0f, 0.0f
+    );
+    const __m256i one_i = _mm256_set1_epi32(1);
+    const __m256i three_i = _mm256_set1_epi32(3);
+    const __m256 one = _mm256_set1_ps(1.0f);
+    const __m256 two = _mm256_set1_ps(2.0f);
+    const __m256 half = _mm256_set1_ps(0.5f);
+    const __m256 six = _mm256_set1_ps(6.0f);
+    const __m256 h7_scale = _mm256_set1_ps(H7_SCALE);
+
+    for (; i + 8 <= n; i += 8) {
+        __m256i v_indice  = _mm256_cvtepu8_epi32(_mm_loadl_epi64((const __m128i *)(in->indice + i)));
+        __m256i v_pareja  = _mm256_cvtepu8_epi32(_mm_loadl_epi64((const __m128i *)(in->pareja + i)));
+        __m256i v_winding = _mm256_cvtepu8_epi32(_mm_loadl_epi64((const __m128i *)(in->winding + i)));
+        __m256i v_peso    = _mm256_cvtepi8_epi32(_mm_loadl_epi64((const __m128i *)(in->peso_ternario + i)));
+        __m256i v_fase    = _mm256_cvtepu8_epi32(_mm_loadl_epi64((const __m128i *)(in->fase_discreta_fragmento + i)));
+
+        // Tipo de decaimiento: _decay_lut[(peso + 1) & 3]
+        __m256i t = _mm256_permutevar8x32_epi32(
+            decay_tab, _mm256_and_si256(_mm256_add_epi32(v_peso, one_i), three_i)
+        );
+
+        // binding_factor = 1 + (winding / 2) * 0.5
+        __m256 bf = _mm256_add_ps(
+            one, _mm256_mul_ps(_mm256_div_ps(_mm256_cvtepi32_ps(v_winding), two), half)
+        );
+
+        _mm256_storeu_ps(out->energy_peak_ev + i,
+                         _mm256_mul_ps(_mm256_permutevar8x32_ps(energy_tab, t), bf));
+        _mm256_storeu_ps(out->half_life_s + i, _mm256_permutevar8x32_ps(half_life_tab, t));
+        _mm256_storeu_ps(out->nuclear_spin + i, _mm256_permutevar8x32_ps(spin_tab, t));
+
+        _mm256_storeu_ps(out->mahalanobis_distance + i,
+                         _mm256_div_ps(_mm256_cvtepi32_ps(v_indice), six));
+        _mm256_storeu_ps(out->lambda_double_non_locality + i,
+                         _mm256_div_ps(_mm256_cvtepi32_ps(v_pareja), six));
+        _mm256_storeu_ps(out->mg_polarity + i,
+                         _mm256_add_ps(_mm256_mul_ps(_mm256_cvtepi32_ps(v_peso), half), half));
+        _mm256_storeu_ps(out->quantum_phase + i,
+                         _mm256_mul_ps(_mm256_cvtepi32_ps(v_fase), h7_scale));
+
+        // int32 → uint8 (8 valores)
+        __m128i t16 = _mm_packs_epi32(_mm256_castsi256_si128(t), _mm256_extracti128_si256(t, 1));
+        _mm_storel_epi64((__m128i *)(out->decay_type + i), _mm_packus_epi16(t16, t16));
+    }
+#endif
+
+    for (; i < n; i++) {
+        TopologicalState topo = {
+            in->indice[i], in->pareja[i], in->winding[i], in->mapeo[i],
+            in->peso_ternario[i], in->fase_discreta_fragmento[i]
+        };
+        TernaryRadioactiveSignature sig;
+        create_radioactive_signature_from_topology(&topo, &sig);
+
+        out->energy_peak_ev[i] = sig.energy_peak_ev;
+        out->half_life_s[i] = sig.half_life_s;
+        out->nuclear_spin[i] = sig.nuclear_spin;
+        out->mahalanobis_distance[i] = sig.mahalanobis_distance;
+        out->lambda_double_non_locality[i] = sig.lambda_double_non_locality;
+        out->mg_polarity[i] = sig.mg_polarity;
+        out->quantum_phase[i] = sig.quantum_phase;
+        out->decay_type[i] = (uint8_t)sig.decay_type;
+    }
+
+    topology_pack_soa(
+        in->indice, in->pareja, in->winding, in->mapeo,
+        in->peso_ternario, in->fase_discreta_fragmento,
+        out->packed_topology, n
+    );
+}
+
 /* ============================================================
  * ESTADO CUÁNTICO DESDE FIRMA
  * ============================================================ */
@@ -223,8 +464,15 @@ static inline void create_quantum_state_from_signature(
 
 #endif /* TERNARY_BIMOTYPE_H */
 """
-        
-        return code
+
+
+class TernaryBiMoTypeCodegen:
+    """Genera código C para Smopsys"""
+    
+    @staticmethod
+    def generate_header() -> str:
+        """Genera ternary_bimotype.h"""
+        return _HEADER_CODE
 
 
 # ============================================================================
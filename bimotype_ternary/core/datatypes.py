@@ -9,9 +9,12 @@ Define las estructuras de datos para el protocolo BiMoType
 Autor: Jacobo Tlacaelel Mina Rodriguez
 """
 
+import math
+import numpy as np
 from enum import Enum
+from operator import methodcaller
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 
 # ============================================================================
@@ -33,7 +36,7 @@ class TipoDecaimiento(Enum):
 # ESTRUCTURAS DE DATOS
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class FirmaRadiactiva:
     """
     Firma radiactiva para protocolo BiMoType.
@@ -93,27 +96,126 @@ class FirmaRadiactiva:
         return cls(**data)
 
 
-@dataclass
+# Layout columnar de FirmaRadiactiva (topology_encoding no es escalar y se omite)
+FIRMA_RADIACTIVA_DTYPE = np.dtype([
+    ('isotope', 'U8'),
+    ('decay_type', 'U8'),
+    ('energy_peak_ev', 'f8'),
+    ('half_life_s', 'f8'),
+    ('nuclear_spin', 'f8'),
+    ('mahalanobis_distance', 'f8'),
+    ('lambda_double_non_locality', 'f8'),
+    ('mg_polarity', 'f8'),
+    ('mg_threshold', 'f8'),
+    ('vacuum_polarity_n_r', 'f8'),
+    ('quantum_phase', 'f8'),
+])
+
+
+class FirmaRadiactivaArray:
+    """
+    Lote de firmas radiactivas sobre un arreglo estructurado NumPy.
+    
+    Serializa N firmas de una sola vez (una columna por campo) en lugar
+    de construir un dict por instancia.
+    """
+    
+    def __init__(self, records: np.ndarray):
+        if records.dtype != FIRMA_RADIACTIVA_DTYPE:
+            raise ValueError(f"dtype inválido: {records.dtype}")
+        self.records = records
+    
+    @classmethod
+    def from_firmas(cls, firmas: List[FirmaRadiactiva]) -> 'FirmaRadiactivaArray':
+        """Crea el lote desde una lista de FirmaRadiactiva"""
+        records = np.array(
+            [
+                (
+                    f.isotope, str(f.decay_type), f.energy_peak_ev, f.half_life_s,
+                    f.nuclear_spin, f.mahalanobis_distance, f.lambda_double_non_locality,
+                    f.mg_polarity, f.mg_threshold, f.vacuum_polarity_n_r, f.quantum_phase
+                )
+                for f in firmas
+            ],
+            dtype=FIRMA_RADIACTIVA_DTYPE
+        )
+        return cls(records)
+    
+    @classmethod
+    def from_records(cls, columns: Dict[str, Any]) -> 'FirmaRadiactivaArray':
+        """Crea el lote desde un dict de columnas (inverso de to_dict_batch)"""
+        n = len(columns['isotope'])
+        records = np.empty(n, dtype=FIRMA_RADIACTIVA_DTYPE)
+        for name in FIRMA_RADIACTIVA_DTYPE.names:
+            records[name] = columns[name]
+        return cls(records)
+    
+    def to_records(self) -> np.ndarray:
+        """Devuelve el arreglo estructurado subyacente (sin copia)"""
+        return self.records
+    
+    def to_dict_batch(self) -> Dict[str, list]:
+        """Convierte a dict de columnas para serialización"""
+        return {name: self.records[name].tolist() for name in FIRMA_RADIACTIVA_DTYPE.names}
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def __getitem__(self, index):
+        """Un índice entero devuelve una FirmaRadiactiva; un slice, otra vista del lote"""
+        if isinstance(index, slice):
+            return FirmaRadiactivaArray(self.records[index])
+        
+        r = self.records[index]
+        return FirmaRadiactiva(
+            isotope=str(r['isotope']),
+            decay_type=TipoDecaimiento(str(r['decay_type'])),
+            energy_peak_ev=float(r['energy_peak_ev']),
+            half_life_s=float(r['half_life_s']),
+            nuclear_spin=float(r['nuclear_spin']),
+            mahalanobis_distance=float(r['mahalanobis_distance']),
+            lambda_double_non_locality=float(r['lambda_double_non_locality']),
+            mg_polarity=float(r['mg_polarity']),
+            mg_threshold=float(r['mg_threshold']),
+            vacuum_polarity_n_r=float(r['vacuum_polarity_n_r']),
+            quantum_phase=float(r['quantum_phase'])
+        )
+
+
+@dataclass(frozen=True)
 class EstadoCuantico:
     """
     Estado cuántico para un qubit en el protocolo BiMoType.
     
-    Representa |ψ⟩ = α|0⟩ + β|1⟩
+    Representa |ψ⟩ = α|0⟩ + β|1⟩. Es inmutable: la fase relativa se
+    calcula una vez y no puede quedar desfasada respecto a α y β.
     """
+    # Slots manuales: _phase es caché, no campo (fuera de fields()/asdict())
+    __slots__ = ('alpha', 'beta', '_phase')
+    
     alpha: complex  # Amplitud del estado |0⟩
     beta: complex   # Amplitud del estado |1⟩
     
     def __post_init__(self):
-        """Valida normalización"""
+        """Valida normalización y calcula la fase relativa"""
         norm = abs(self.alpha)**2 + abs(self.beta)**2
         if abs(norm - 1.0) > 1e-6:
             raise ValueError(f"Estado no normalizado: |α|² + |β|² = {norm}")
+        
+        phase = 0.0
+        if self.alpha != 0:
+            ratio = self.beta / self.alpha
+            # Amplitudes reales (caso habitual): atan2 sin crear objetos complex
+            if isinstance(ratio, (complex, np.complexfloating)):
+                phase = math.atan2(ratio.imag, ratio.real)
+            else:
+                phase = math.atan2(0.0, ratio)
+        object.__setattr__(self, '_phase', phase)
     
     @property
     def phase(self) -> float:
-        """Calcula la fase relativa"""
-        import cmath
-        return cmath.phase(self.beta / self.alpha) if self.alpha != 0 else 0.0
+        """Fase relativa (calculada en __post_init__)"""
+        return self._phase
     
     @property
     def probability_0(self) -> float:
@@ -138,6 +240,63 @@ class EstadoCuantico:
         }
 
 
+@dataclass
+class EstadoCuanticoArray:
+    """
+    Lote de estados cuánticos en columnas (amplitudes α y β).
+    
+    Calcula fase y probabilidades de N qubits con operaciones
+    vectorizadas en lugar de propiedades por instancia.
+    """
+    alpha: np.ndarray  # complex128, amplitudes de |0⟩
+    beta: np.ndarray   # complex128, amplitudes de |1⟩
+    
+    def __post_init__(self):
+        """Valida normalización de todo el lote"""
+        self.alpha = np.asarray(self.alpha, dtype=np.complex128)
+        self.beta = np.asarray(self.beta, dtype=np.complex128)
+        norm = self.probability_0 + (self.beta.real**2 + self.beta.imag**2)
+        if np.any(np.abs(norm - 1.0) > 1e-6):
+            raise ValueError("Estados no normalizados en el lote")
+    
+    @classmethod
+    def from_estados(cls, estados: List[EstadoCuantico]) -> 'EstadoCuanticoArray':
+        """Crea el lote desde una lista de EstadoCuantico"""
+        n = len(estados)
+        alpha = np.fromiter((e.alpha for e in estados), dtype=np.complex128, count=n)
+        beta = np.fromiter((e.beta for e in estados), dtype=np.complex128, count=n)
+        return cls(alpha, beta)
+    
+    def __len__(self) -> int:
+        return len(self.alpha)
+    
+    @property
+    def phase(self) -> np.ndarray:
+        """Fase relativa de cada estado (0 donde α = 0)"""
+        zero = self.alpha == 0
+        phase = np.angle(self.beta / np.where(zero, 1, self.alpha))
+        phase[zero] = 0.0
+        return phase
+    
+    @property
+    def probability_0(self) -> np.ndarray:
+        """Probabilidad de medir |0⟩"""
+        return self.alpha.real**2 + self.alpha.imag**2
+    
+    @property
+    def probability_1(self) -> np.ndarray:
+        """Probabilidad de medir |1⟩"""
+        return 1.0 - self.probability_0
+
+
+_to_dict = methodcaller('to_dict')
+
+
+def _state_to_dict(qs):
+    """Convierte un estado a dict si no lo es ya"""
+    return qs.to_dict() if hasattr(qs, 'to_dict') else qs
+
+
 @dataclass
 class PaqueteBiMoType:
     """
@@ -151,16 +310,25 @@ class PaqueteBiMoType:
     encoding_metadata: Dict[str, Any]
     
     def to_dict(self) -> Dict:
-        """Convierte a diccionario para JSON"""
+        """
+        Convierte a diccionario para JSON.
+        
+        Se asume una lista homogénea (decidida por el primer elemento);
+        las listas mixtas recurren a la conversión elemento a elemento.
+        """
+        states = self.quantum_states
+        convert = _to_dict if states and type(states[0]) is EstadoCuantico else _state_to_dict
+        try:
+            quantum_states = list(map(convert, states))
+        except AttributeError:
+            quantum_states = list(map(_state_to_dict, states))
+        
         return {
             'packet_id': self.packet_id,
             'protocol_version': self.protocol_version,
             'timestamp': self.timestamp,
             'message': self.message,
-            'quantum_states': [
-                qs.to_dict() if hasattr(qs, 'to_dict') else qs
-                for qs in self.quantum_states
-            ],
+            'quantum_states': quantum_states,
             'encoding_metadata': self.encoding_metadata
         }
 
@@ -227,6 +395,28 @@ RADIOACTIVE_ISOTOPES = {
 }
 
 
+# Vista columnar (SoA) de RADIOACTIVE_ISOTOPES: un arreglo por campo
+_ISO_IDX = {name: i for i, name in enumerate(RADIOACTIVE_ISOTOPES)}
+_ISO_NAMES = np.array(list(RADIOACTIVE_ISOTOPES))
+_ISO_Z = np.array([d['Z'] for d in RADIOACTIVE_ISOTOPES.values()], dtype=np.int16)
+_ISO_A = np.array([d['A'] for d in RADIOACTIVE_ISOTOPES.values()], dtype=np.int16)
+_ISO_DECAY = np.array([d['decay_type'].value for d in RADIOACTIVE_ISOTOPES.values()])
+_ISO_ENERGY_EV = np.array([d['energy_ev'] for d in RADIOACTIVE_ISOTOPES.values()], dtype=np.float64)
+_ISO_HALF_LIFE_S = np.array(
+    [d['half_life_years'] for d in RADIOACTIVE_ISOTOPES.values()], dtype=np.float64
+) * 3.154e7  # inf se conserva
+_ISO_SPIN = np.array([d['spin'] for d in RADIOACTIVE_ISOTOPES.values()], dtype=np.float64)
+
+# Valores ya convertidos por isótopo: (decay_type, energy_ev, half_life_s, spin)
+_ISOTOPE_PRECOMPUTED = {
+    name: (RADIOACTIVE_ISOTOPES[name]['decay_type'], energy, half_life, spin)
+    for name, energy, half_life, spin in zip(
+        _ISO_NAMES.tolist(), _ISO_ENERGY_EV.tolist(),
+        _ISO_HALF_LIFE_S.tolist(), _ISO_SPIN.tolist()
+    )
+}
+
+
 # ============================================================================
 # FUNCIONES AUXILIARES
 # ============================================================================
@@ -242,24 +432,27 @@ def crear_firma_desde_isotopo(isotope_name: str, **kwargs) -> FirmaRadiactiva:
     Returns:
         FirmaRadiactiva configurada
     """
-    if isotope_name not in RADIOACTIVE_ISOTOPES:
+    iso = _ISOTOPE_PRECOMPUTED.get(isotope_name)
+    if iso is None:
         raise ValueError(f"Isótopo desconocido: {isotope_name}")
     
-    iso_data = RADIOACTIVE_ISOTOPES[isotope_name]
+    decay_type, energy_ev, half_life_s, spin = iso
+    
+    if not kwargs:
+        return FirmaRadiactiva(
+            isotope_name, decay_type, energy_ev, half_life_s, spin, 0.5, 0.5, 0.5
+        )
     
     # Valores por defecto
     defaults = {
         'isotope': isotope_name,
-        'decay_type': iso_data['decay_type'],
-        'energy_peak_ev': iso_data['energy_ev'],
-        'half_life_s': iso_data['half_life_years'] * 3.154e7 if iso_data['half_life_years'] != float('inf') else float('inf'),
-        'nuclear_spin': iso_data['spin'],
+        'decay_type': decay_type,
+        'energy_peak_ev': energy_ev,
+        'half_life_s': half_life_s,
+        'nuclear_spin': spin,
         'mahalanobis_distance': 0.5,
         'lambda_double_non_locality': 0.5,
-        'mg_polarity': 0.5,
-        'mg_threshold': 0.5,
-        'vacuum_polarity_n_r': 0.0,
-        'quantum_phase': 0.0
+        'mg_polarity': 0.5
     }
     
     # Sobrescribir con kwargs
@@ -268,6 +461,19 @@ def crear_firma_desde_isotopo(isotope_name: str, **kwargs) -> FirmaRadiactiva:
     return FirmaRadiactiva(**defaults)
 
 
+def isotopos_por_decaimiento(decay_type: TipoDecaimiento) -> List[str]:
+    """
+    Lista los isótopos conocidos con un tipo de decaimiento dado.
+    
+    Args:
+        decay_type: Tipo de decaimiento a buscar
+    
+    Returns:
+        Nombres de los isótopos, en el orden de RADIOACTIVE_ISOTOPES
+    """
+    return _ISO_NAMES[_ISO_DECAY == decay_type.value].tolist()
+
+
 if __name__ == '__main__':
     # Demo
     print("=" * 80)
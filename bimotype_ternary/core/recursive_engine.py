@@ -4,24 +4,70 @@ import hashlib
 import time
 import math
 import platform
+from functools import lru_cache, cached_property
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from types import MappingProxyType
+from dataclasses import dataclass, asdict, field
 from typing import Dict, Any, Optional
 
+import numpy as np
+
 # Database integration
 from ..database.manager import DatabaseManager
 
-@dataclass
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Below this many shared numeric keys the per-key float arithmetic is cheaper
+# than building two arrays (and dispatching into the JIT kernel)
+BLEND_ARRAY_MIN_KEYS = 32
+
+
+def _blend_numeric_numpy(prev: np.ndarray, curr: np.ndarray,
+                         w_prev: float = 0.7, w_curr: float = 0.3) -> np.ndarray:
+    """Metriplectic blend prev*w_prev + curr*w_curr over parallel float64 arrays."""
+    return prev * w_prev + curr * w_curr
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _blend_numeric_numba(prev: np.ndarray, curr: np.ndarray,
+                             w_prev: float = 0.7, w_curr: float = 0.3) -> np.ndarray:
+        """Same blend as _blend_numeric_numpy, as an explicit compiled loop."""
+        out = np.empty_like(prev)
+        for i in range(prev.shape[0]):
+            out[i] = prev[i] * w_prev + curr[i] * w_curr
+        return out
+    
+    _blend_numeric = _blend_numeric_numba
+else:
+    _blend_numeric = _blend_numeric_numpy
+
+@dataclass(frozen=True)
 class HardwareMetrics:
     """Static hardware identifiers for the fingerprint."""
-    node: str = platform.node()
-    system: str = platform.system()
-    machine: str = platform.machine()
-    cpu_count: int = os.cpu_count() or 0
-    hw_uuid: str = str(uuid.getnode()) # MAC address based UUID
+    node: str = field(default_factory=platform.node)
+    system: str = field(default_factory=platform.system)
+    machine: str = field(default_factory=platform.machine)
+    cpu_count: int = field(default_factory=lambda: os.cpu_count() or 0)
+    hw_uuid: str = field(default_factory=lambda: str(uuid.getnode())) # MAC address based UUID
     
-    def to_hash_input(self) -> str:
+    @cached_property
+    def _hash_input(self) -> str:
         return f"{self.node}-{self.system}-{self.machine}-{self.cpu_count}-{self.hw_uuid}"
+    
+    def to_hash_input(self) -> str:
+        return self._hash_input
+
+
+@lru_cache(maxsize=1)
+def _get_hw_metrics() -> HardwareMetrics:
+    """Reads the hardware identifiers once per process."""
+    return HardwareMetrics()
 
 class RecursiveEngine:
     """
@@ -34,24 +80,29 @@ class RecursiveEngine:
     
     def __init__(self, db_path: str = "bimotype.sqlite3"):
         self.db = DatabaseManager(db_path)
-        self.hw_metrics = HardwareMetrics()
+        self.hw_metrics = _get_hw_metrics()
+        self._hw_metrics_dict = MappingProxyType(asdict(self.hw_metrics))
+        self._pi_phi = math.pi * self.PHI
+        # Static part of the fingerprint input, hashed once and cloned per call
+        self._hash_prefix = hashlib.sha256(self.hw_metrics.to_hash_input().encode() + b"-On:")
         
     def generate_fingerprint(self, session_n: int) -> str:
         """
         Generates a hardware fingerprint modulated by the Golden Operator O_n.
         Rule 2.1: O_n = cos(pi n) * cos(pi phi n)
         """
-        # Calculate O_n modulation
-        o_n = math.cos(math.pi * session_n) * math.cos(math.pi * self.PHI * session_n)
+        # Calculate O_n modulation (cos(pi n) = (-1)^n for integer n)
+        sign = -1.0 if session_n & 1 else 1.0
+        o_n = sign * math.cos(self._pi_phi * session_n)
         
         # Combine hardware metrics with modulation
-        raw_input = self.hw_metrics.to_hash_input()
-        input_with_modulation = f"{raw_input}-On:{o_n:.10f}-S:{session_n}"
+        h = self._hash_prefix.copy()
+        h.update(f"{o_n:.10f}-S:{session_n}".encode())
         
-        fingerprint = hashlib.sha256(input_with_modulation.encode()).hexdigest()
+        fingerprint = h.hexdigest()
         
         # Guardar registro de identidad en DB
-        self.db.record_identity(fingerprint, asdict(self.hw_metrics), o_n)
+        self.db.record_identity(fingerprint, self._hw_metrics_dict, o_n)
         
         return fingerprint
 
@@ -80,8 +131,10 @@ class RecursiveEngine:
         except:
             pass
             
-        self.db.create_session_record(session_n, fingerprint)
-        self.db.add_audit_log(fingerprint, "SESSION_START", f"Iniciando sesión {session_id}")
+        # Registro de sesión + evento de arranque en una sola transacción
+        with self.db.session() as db:
+            self.db.create_session_record(session_n, fingerprint, db=db)
+            self.db.add_audit_log(fingerprint, "SESSION_START", f"Iniciando sesión {session_id}", db=db)
 
     def compute_feedback_loop(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -92,11 +145,20 @@ class RecursiveEngine:
         
         # Simple recursive merge/evolution logic
         evolved_data = prev_data.copy()
+        numeric_keys = []
         for k, v in input_data.items():
             if k in evolved_data and isinstance(v, (int, float)):
-                # Metriplectic-like evolution: mix current with record
-                evolved_data[k] = (evolved_data[k] * 0.7) + (v * 0.3)
+                numeric_keys.append(k)
             else:
                 evolved_data[k] = v
         
+        # Metriplectic-like evolution: mix current with record
+        if len(numeric_keys) >= BLEND_ARRAY_MIN_KEYS:
+            prev = np.array([evolved_data[k] for k in numeric_keys], dtype=np.float64)
+            curr = np.array([input_data[k] for k in numeric_keys], dtype=np.float64)
+            evolved_data.update(zip(numeric_keys, _blend_numeric(prev, curr).tolist()))
+        else:
+            for k in numeric_keys:
+                evolved_data[k] = (evolved_data[k] * 0.7) + (input_data[k] * 0.3)
+        
         return evolved_data
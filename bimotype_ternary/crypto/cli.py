@@ -11,6 +11,7 @@ Author: Jacobo Tlacaelel Mina Rodriguez
 import click
 import sys
 import json
+from functools import lru_cache
 from .password_generator import QuantumPasswordGenerator
 from .encryptor import QuantumEncryptor
 from ..core.session_manager import SessionManager
@@ -26,6 +27,16 @@ def get_sm():
         _session_manager = SessionManager()
     return _session_manager
 
+@lru_cache(maxsize=1)
+def get_encryptor() -> QuantumEncryptor:
+    """Encriptador compartido por los comandos del CLI."""
+    return QuantumEncryptor()
+
+@lru_cache(maxsize=1)
+def get_password_generator() -> QuantumPasswordGenerator:
+    """Generador de contraseñas compartido por los comandos del CLI."""
+    return QuantumPasswordGenerator()
+
 @click.group()
 @click.version_option(version='1.0.0')
 def cli():
@@ -45,11 +56,17 @@ def password(length, charset, count):
     """Genera contraseñas cuánticas seguras."""
     sm = get_sm()
     try:
-        gen = QuantumPasswordGenerator()
+        gen = get_password_generator()
+        events = []
         for i in range(count):
             pwd = gen.generate(length=length, charset=charset)
             click.echo(pwd)
-            sm.engine.db.add_audit_log(sm.current_fingerprint, "PWD_GEN", f"Contraseña de {length} caracteres generada.")
+            events.append({
+                'fingerprint': sm.current_fingerprint,
+                'event_type': "PWD_GEN",
+                'description': f"Contraseña de {length} caracteres generada."
+            })
+        sm.engine.db.add_audit_logs(events)
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
@@ -62,7 +79,7 @@ def encrypt(input_file, output_file, password):
     """Encripta un archivo usando llaves derivadas cuánticamente."""
     sm = get_sm()
     try:
-        encryptor = QuantumEncryptor()
+        encryptor = get_encryptor()
         encryptor.encrypt_file(input_file, output_file, password)
         sm.engine.db.add_audit_log(sm.current_fingerprint, "FILE_ENC", f"Archivo {input_file} encriptado.")
         click.echo(f"✓ Encriptado correctamente en {output_file}")
@@ -78,7 +95,7 @@ def decrypt(input_file, output_file, password):
     """Descifra un archivo."""
     sm = get_sm()
     try:
-        encryptor = QuantumEncryptor()
+        encryptor = get_encryptor()
         encryptor.decrypt_file(input_file, output_file, password)
         sm.engine.db.add_audit_log(sm.current_fingerprint, "FILE_DEC", f"Archivo {input_file} descifrado.")
         click.echo(f"✓ Descifrado correctamente en {output_file}")
@@ -98,7 +115,10 @@ def audit_sessions(limit):
     sm = get_sm()
     db = sm.engine.db.get_session()
     try:
-        sessions = db.query(SystemSession).order_by(SystemSession.id.desc()).limit(limit).all()
+        # id es INTEGER PRIMARY KEY (rowid): ORDER BY id DESC LIMIT recorre el árbol al revés sin ordenar
+        sessions = db.query(
+            SystemSession.id, SystemSession.session_number, SystemSession.fingerprint, SystemSession.startup_time
+        ).order_by(SystemSession.id.desc()).limit(limit).yield_per(max(limit, 1))
         click.echo(f"\n{'ID':<5} {'N':<3} {'Fingerprint':<20} {'Startup Time':<20}")
         click.echo("-" * 60)
         for s in sessions:
@@ -113,7 +133,9 @@ def audit_logs(limit):
     sm = get_sm()
     db = sm.engine.db.get_session()
     try:
-        logs = db.query(AuditLog).order_by(AuditLog.id.desc()).limit(limit).all()
+        logs = db.query(
+            AuditLog.timestamp, AuditLog.event_type, AuditLog.description
+        ).order_by(AuditLog.id.desc()).limit(limit).yield_per(max(limit, 1))
         click.echo(f"\n{'Timestamp':<20} {'Event':<12} {'Description'}")
         click.echo("-" * 70)
         for l in logs:
@@ -10,24 +10,64 @@ Author: Jacobo Tlacaelel Mina Rodriguez
 
 import os
 import json
+import mmap
 import time
+import base64
+import struct
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass, asdict
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
-try:
-    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-    from cryptography.exceptions import InvalidTag
-    CRYPTO_AVAILABLE = True
-except ImportError:
-    CRYPTO_AVAILABLE = False
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.exceptions import InvalidTag
+
+from .key_derivation import (
+    QuantumKeyDerivation, KDF_PBKDF2_SHA512, KDF_PBKDF2_SHA256, SUPPORTED_KDFS,
+    DEFAULT_ITERATIONS, LEGACY_ITERATIONS
+)
+
+# Contenedor binario: MAGIC | len(header) u32 LE | header JSON | nonce | salt | ciphertext
+CONTAINER_MAGIC = b'QCRY'
+_CONTAINER_PREFIX = struct.Struct('<4sI')
+_CONTAINER_HEADER_FIELDS = frozenset({'metadata', 'timestamp', 'version', 'nonce_len', 'salt_len'})
+
+# Archivos: AES-GCM incremental por bloques de 32 KiB; tag de 16 bytes al final
+GCM_CHUNK_SIZE = 32 * 1024
+GCM_TAG_SIZE = 16
+
+# Tamaños de salt (KDF) y nonce (AES-GCM, 96 bits)
+SALT_SIZE = 32
+NONCE_SIZE = 12
+
+# Contextos AES-GCM ya inicializados, por clave derivada (LRU)
+AEAD_CACHE_SIZE = 64
+
+# verify_signature: campos obligatorios e isótopos aceptados
+_REQUIRED_METADATA_FIELDS = frozenset({
+    'isotope', 'decay_type', 'h7_index', 'h7_pair',
+    'quantum_phase', 'mg_polarity', 'topology_state_index'
+})
+_VALID_ISOTOPES = frozenset({'Sr90', 'Tc99m', 'Pu238'})
 
 try:
-    from ..topology.encoder import CodificadorTopologicoBigEndian
-    from ..integration.mapper import TopologyBiMoTypeMapper
-    from .key_derivation import QuantumKeyDerivation
-    TOPOLOGY_AVAILABLE = True
+    import orjson
+    
+    def _dumps(data: Dict) -> bytes:
+        return orjson.dumps(data)
+    
+    _loads = orjson.loads
+    ORJSON_AVAILABLE = True
 except ImportError:
-    TOPOLOGY_AVAILABLE = False
+    def _dumps(data: Dict) -> bytes:
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+    
+    _loads = json.loads
+    ORJSON_AVAILABLE = False
 
 
 @dataclass
@@ -55,8 +95,12 @@ class EncryptedPacket:
         return asdict(self)
     
     def to_json(self) -> str:
-        """Convierte a JSON"""
-        return json.dumps(self.to_dict(), indent=2)
+        """Convierte a JSON compacto"""
+        return self.to_json_bytes().decode('utf-8')
+    
+    def to_json_bytes(self) -> bytes:
+        """Convierte a JSON compacto en bytes UTF-8 (para escribir en modo 'wb')"""
+        return _dumps(self.to_dict())
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'EncryptedPacket':
@@ -64,10 +108,142 @@ class EncryptedPacket:
         return cls(**data)
     
     @classmethod
-    def from_json(cls, json_str: str) -> 'EncryptedPacket':
-        """Crea desde JSON"""
-        data = json.loads(json_str)
+    def from_json(cls, json_str) -> 'EncryptedPacket':
+        """Crea desde JSON (str o bytes UTF-8)"""
+        data = _loads(json_str)
         return cls.from_dict(data)
+    
+    def to_bytes(self) -> bytes:
+        """Convierte al contenedor binario (sin base64)"""
+        nonce = base64.b64decode(self.nonce)
+        salt = base64.b64decode(self.salt)
+        header = _pack_container_header(nonce, salt, self.metadata, self.timestamp, self.version)
+        return header + nonce + salt + base64.b64decode(self.ciphertext)
+    
+    @classmethod
+    def from_bytes(cls, data) -> 'EncryptedPacket':
+        """Crea desde el contenedor binario"""
+        ciphertext, nonce, salt, header = _parse_container(data)
+        return cls(
+            ciphertext=base64.b64encode(ciphertext).decode('utf-8'),
+            nonce=base64.b64encode(nonce).decode('utf-8'),
+            salt=base64.b64encode(salt).decode('utf-8'),
+            metadata=header['metadata'],
+            timestamp=header['timestamp'],
+            version=header['version']
+        )
+
+
+def _pack_container_header(
+    nonce: bytes,
+    salt: bytes,
+    metadata: Dict,
+    timestamp: float,
+    version: str
+) -> bytes:
+    """Construye la cabecera del contenedor binario (hasta el nonce, exclusive)"""
+    header = _dumps({
+        'metadata': metadata,
+        'timestamp': timestamp,
+        'version': version,
+        'nonce_len': len(nonce),
+        'salt_len': len(salt)
+    })
+    return _CONTAINER_PREFIX.pack(CONTAINER_MAGIC, len(header)) + header
+
+
+def _parse_container_header(view: memoryview):
+    """
+    Lee y valida la cabecera de un contenedor binario.
+    
+    Args:
+        view: Vista del contenedor completo
+        
+    Returns:
+        Tupla (header, desplazamiento del nonce)
+        
+    Raises:
+        ValueError: Si no es un contenedor o está truncado/malformado
+    """
+    if len(view) < _CONTAINER_PREFIX.size:
+        raise ValueError("Invalid container")
+    magic, header_len = _CONTAINER_PREFIX.unpack_from(view)
+    if magic != CONTAINER_MAGIC:
+        raise ValueError("Not a QuantumCrypto binary container")
+    
+    pos = _CONTAINER_PREFIX.size
+    try:
+        header = _loads(bytes(view[pos:pos + header_len]))
+    except ValueError as e:
+        raise ValueError("Invalid container") from e
+    if not isinstance(header, dict) or not _CONTAINER_HEADER_FIELDS <= header.keys():
+        raise ValueError("Invalid container")
+    
+    nonce_len = header['nonce_len']
+    salt_len = header['salt_len']
+    if not (isinstance(nonce_len, int) and isinstance(salt_len, int)
+            and nonce_len >= 0 and salt_len >= 0
+            and pos + header_len + nonce_len + salt_len <= len(view)):
+        raise ValueError("Invalid container")
+    
+    return header, pos + header_len
+
+
+def _parse_container(data):
+    """
+    Separa un contenedor binario en sus componentes.
+    
+    Args:
+        data: Contenedor (bytes, mmap o memoryview)
+        
+    Returns:
+        Tupla (ciphertext, nonce, salt, header); los binarios son vistas sin copia
+        
+    Raises:
+        ValueError: Si no es un contenedor o está truncado/malformado
+    """
+    view = memoryview(data)
+    try:
+        header, pos = _parse_container_header(view)
+    except ValueError:
+        # Liberar la vista: un mmap no puede cerrarse con vistas exportadas
+        view.release()
+        raise
+    
+    nonce = view[pos:pos + header['nonce_len']]
+    pos += header['nonce_len']
+    salt = view[pos:pos + header['salt_len']]
+    pos += header['salt_len']
+    
+    return view[pos:], nonce, salt, header
+
+@contextmanager
+def _atomic_output(output_path: str):
+    """
+    Escribe en un temporal junto a output_path y lo reemplaza solo al terminar sin error.
+    
+    Args:
+        output_path: Ruta final del archivo
+        
+    Yields:
+        Archivo temporal abierto en modo 'wb'; si el bloque falla se borra
+        y output_path queda intacto
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(output_path)),
+        prefix='.' + os.path.basename(output_path) + '.',
+        suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            yield out
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
 
 
 class QuantumEncryptor:
@@ -77,56 +253,71 @@ class QuantumEncryptor:
     Características:
     - AES-256-GCM para encriptación autenticada
     - Claves derivadas con PBKDF2 + topología cuántica
-    - Nonce generado desde fase cuántica
+    - Nonce aleatorio de 96 bits (os.urandom)
     - Metadata: firma isotópica, índice H7, polaridad MG
     - Verificación de autenticidad
     """
     
-    def __init__(self, iterations: int = 100000):
+    def __init__(self, iterations: Optional[int] = None, kdf: str = None):
         """
         Inicializa el encriptador cuántico.
         
         Args:
-            iterations: Número de iteraciones PBKDF2
+            iterations: Número de iteraciones PBKDF2 (None = DEFAULT_ITERATIONS
+                        del KDF); se guarda en metadata['iterations']
+            kdf: KDF para encriptar ('pbkdf2-sha256' por defecto,
+                 'pbkdf2-sha512' o 'scrypt'); se guarda en metadata['kdf']
         """
-        if not CRYPTO_AVAILABLE:
-            raise ImportError("cryptography library not available. Install with: pip install cryptography")
-        
-        if not TOPOLOGY_AVAILABLE:
-            raise ImportError("Topology encoder not available")
-        
-        self.iterations = iterations
+        if kdf is None:
+            kdf = KDF_PBKDF2_SHA256
+        if kdf not in SUPPORTED_KDFS:
+            raise ValueError(f"KDF no soportado: {kdf}")
+        
+        self.iterations = DEFAULT_ITERATIONS[kdf] if iterations is None else iterations
+        # Paquetes sin metadata['iterations'] se cifraron con el valor del llamador
+        # o, si no lo indicó, con el antiguo valor por defecto
+        self._legacy_iterations = LEGACY_ITERATIONS if iterations is None else iterations
+        self.kdf = kdf
         self.key_derivation = QuantumKeyDerivation()
-        self.topology_encoder = CodificadorTopologicoBigEndian()
-        self.mapper = TopologyBiMoTypeMapper()
+        self.topology_encoder = self.key_derivation.topology_encoder
+        self.mapper = self.key_derivation.mapper
+        
+        # Caché LRU: clave derivada → AESGCM (solo el nonce cambia entre llamadas)
+        self._aead_cache: OrderedDict = OrderedDict()
+        self._aead_cache_lock = threading.Lock()
     
-    def _generate_nonce_from_topology(self, password: str) -> bytes:
+    def _aead(self, key: bytes) -> AESGCM:
         """
-        Genera un nonce único desde estados topológicos.
+        Devuelve el contexto AES-GCM de una clave, creándolo una sola vez.
         
         Args:
-            password: Contraseña para derivar nonce
+            key: Clave derivada de 32 bytes
             
         Returns:
-            Nonce de 12 bytes (recomendado para AES-GCM)
+            Instancia AESGCM reutilizable
         """
-        # Usar timestamp + password para unicidad
-        timestamp = str(time.time()).encode()
-        nonce_seed = password.encode() + timestamp
-        
-        # Extraer entropía de topología
-        salt = self.key_derivation._create_topology_salt(password)
-        
-        # Combinar y hash
-        nonce_material = nonce_seed + salt
-        
-        # Usar os.urandom para seguridad adicional
-        system_random = os.urandom(12)
-        
-        # XOR para mezclar
-        nonce = bytes(a ^ b for a, b in zip(system_random, nonce_material[:12]))
+        with self._aead_cache_lock:
+            aead = self._aead_cache.get(key)
+            if aead is not None:
+                self._aead_cache.move_to_end(key)
+                return aead
+            
+            aead = AESGCM(key)
+            self._aead_cache[key] = aead
+            if len(self._aead_cache) > AEAD_CACHE_SIZE:
+                self._aead_cache.popitem(last=False)
+        return aead
+    
+    def _generate_salt_and_nonce(self):
+        """
+        Genera el salt de derivación y el nonce AES-GCM con una sola llamada al CSPRNG.
         
-        return nonce
+        Returns:
+            Tupla (salt de 32 bytes, nonce de 12 bytes)
+        """
+        # GCM exige unicidad por clave: 96 bits del CSPRNG del sistema bastan
+        rand = os.urandom(SALT_SIZE + NONCE_SIZE)
+        return rand[:SALT_SIZE], rand[SALT_SIZE:]
     
     def _create_quantum_metadata(self, password: str, salt: bytes) -> Dict:
         """
@@ -136,16 +327,28 @@ class QuantumEncryptor:
             password: Contraseña usada
             salt: Salt usado
             
+        Returns:
+            Diccionario con metadata cuántica
+        """
+        return self._create_quantum_metadata_from_hash(
+            hashlib.sha256(password.encode()).digest(), salt
+        )
+    
+    def _create_quantum_metadata_from_hash(self, pwd_hash: bytes, salt: bytes) -> Dict:
+        """
+        Crea la metadata cuántica desde el SHA-256 ya calculado de la contraseña.
+        
+        Args:
+            pwd_hash: SHA-256 de la contraseña
+            salt: Salt usado
+            
         Returns:
             Diccionario con metadata cuántica
         """
         # Seleccionar estado topológico basado en password
-        import hashlib
-        pwd_hash = hashlib.sha256(password.encode()).digest()
         state_idx = pwd_hash[0] % 6
         
-        state = self.topology_encoder.topology_entries[state_idx]
-        sig = self.mapper.create_radioactive_signature_from_topology(state)
+        state, sig, _ = self.key_derivation._precomputed_states[state_idx]
         
         metadata = {
             'isotope': sig['isotope'],
@@ -159,48 +362,85 @@ class QuantumEncryptor:
         
         return metadata
     
-    def encrypt(
-        self,
-        plaintext: bytes,
-        password: str,
-        associated_data: Optional[bytes] = None
-    ) -> EncryptedPacket:
+    def _prepare_encryption(self, password: str):
         """
-        Encripta datos usando AES-256-GCM con clave derivada cuánticamente.
+        Genera salt, clave, nonce y metadata para una encriptación.
         
         Args:
-            plaintext: Datos a encriptar
             password: Contraseña para derivar clave
-            associated_data: Datos adicionales autenticados (AAD)
             
         Returns:
-            Paquete encriptado con metadata cuántica
+            Tupla (key, nonce, salt, metadata)
         """
-        # Generar salt único
-        salt = os.urandom(32)
+        # Hash de la contraseña: una sola vez para KDF y metadata
+        pwd_hash = hashlib.sha256(password.encode()).digest()
+        
+        # Generar salt único y nonce (un solo getrandom)
+        salt, nonce = self._generate_salt_and_nonce()
         
         # Derivar clave de 32 bytes (256 bits)
         key = self.key_derivation.derive_key(
             password,
             salt=salt,
             iterations=self.iterations,
-            key_length=32
+            key_length=32,
+            algorithm=self.kdf,
+            password_hash=pwd_hash
         )
         
-        # Generar nonce
-        nonce = self._generate_nonce_from_topology(password)
+        # Crear metadata cuántica
+        metadata = self._create_quantum_metadata_from_hash(pwd_hash, salt)
+        metadata['kdf'] = self.kdf
+        metadata['iterations'] = self.iterations
         
-        # Crear encriptador AES-GCM
-        aesgcm = AESGCM(key)
+        return key, nonce, salt, metadata
+    
+    def _encrypt_raw(
+        self,
+        plaintext,
+        password: str,
+        associated_data: Optional[bytes] = None
+    ):
+        """
+        Encripta y devuelve los componentes binarios sin codificar.
         
-        # Encriptar
-        ciphertext = aesgcm.encrypt(nonce, plaintext, associated_data)
+        Args:
+            plaintext: Datos a encriptar (cualquier objeto tipo bytes)
+            password: Contraseña para derivar clave
+            associated_data: Datos adicionales autenticados (AAD)
+            
+        Returns:
+            Tupla (ciphertext, nonce, salt, metadata)
+        """
+        key, nonce, salt, metadata = self._prepare_encryption(password)
         
-        # Crear metadata cuántica
-        metadata = self._create_quantum_metadata(password, salt)
+        # Encriptar con AES-GCM
+        ciphertext = self._aead(key).encrypt(nonce, plaintext, associated_data)
+        
+        return ciphertext, nonce, salt, metadata
+    
+    def encrypt(
+        self,
+        plaintext: bytes,
+        password: str,
+        associated_data: Optional[bytes] = None
+    ) -> EncryptedPacket:
+        """
+        Encripta datos usando AES-256-GCM con clave derivada cuánticamente.
+        
+        Args:
+            plaintext: Datos a encriptar
+            password: Contraseña para derivar clave
+            associated_data: Datos adicionales autenticados (AAD)
+            
+        Returns:
+            Paquete encriptado con metadata cuántica
+        """
+        ciphertext, nonce, salt, metadata = self._encrypt_raw(
+            plaintext, password, associated_data
+        )
         
         # Crear paquete
-        import base64
         packet = EncryptedPacket(
             ciphertext=base64.b64encode(ciphertext).decode('utf-8'),
             nonce=base64.b64encode(nonce).decode('utf-8'),
@@ -211,6 +451,100 @@ class QuantumEncryptor:
         
         return packet
     
+    def encrypt_many(
+        self,
+        plaintexts: List[bytes],
+        password: str,
+        associated_data: Optional[bytes] = None
+    ) -> List[EncryptedPacket]:
+        """
+        Encripta varios mensajes con una sola derivación de clave.
+        
+        Todos los paquetes comparten salt (y por tanto clave y contexto AES-GCM);
+        cada uno lleva su propio nonce aleatorio de 96 bits.
+        
+        Args:
+            plaintexts: Mensajes a encriptar
+            password: Contraseña para derivar clave
+            associated_data: Datos adicionales autenticados (AAD)
+            
+        Returns:
+            Lista de paquetes encriptados, en el mismo orden
+        """
+        key, nonce, salt, metadata = self._prepare_encryption(password)
+        aead = self._aead(key)
+        salt_b64 = base64.b64encode(salt).decode('utf-8')
+        
+        packets = []
+        for i, plaintext in enumerate(plaintexts):
+            if i:
+                nonce = os.urandom(NONCE_SIZE)
+            packets.append(EncryptedPacket(
+                ciphertext=base64.b64encode(
+                    aead.encrypt(nonce, plaintext, associated_data)
+                ).decode('utf-8'),
+                nonce=base64.b64encode(nonce).decode('utf-8'),
+                salt=salt_b64,
+                metadata=dict(metadata),
+                timestamp=time.time()
+            ))
+        
+        return packets
+    
+    def encrypt_to_bytes(
+        self,
+        plaintext: bytes,
+        password: str,
+        associated_data: Optional[bytes] = None
+    ) -> bytes:
+        """
+        Encripta directamente al contenedor binario, sin base64 ni EncryptedPacket.
+        
+        Equivale a encrypt(...).to_bytes(); pensado para muchos registros pequeños.
+        
+        Args:
+            plaintext: Datos a encriptar
+            password: Contraseña para derivar clave
+            associated_data: Datos adicionales autenticados (AAD)
+            
+        Returns:
+            Contenedor binario (ver CONTAINER_MAGIC)
+        """
+        ciphertext, nonce, salt, metadata = self._encrypt_raw(
+            plaintext, password, associated_data
+        )
+        header = _pack_container_header(
+            nonce, salt, metadata, time.time(), EncryptedPacket.version
+        )
+        return b''.join((header, nonce, salt, ciphertext))
+    
+    def decrypt_from_bytes(
+        self,
+        data,
+        password: str,
+        associated_data: Optional[bytes] = None
+    ) -> bytes:
+        """
+        Desencripta un contenedor binario producido por encrypt_to_bytes/to_bytes.
+        
+        Args:
+            data: Contenedor binario (bytes, mmap o memoryview)
+            password: Contraseña para derivar clave
+            associated_data: Datos adicionales autenticados (AAD)
+            
+        Returns:
+            Datos desencriptados
+        """
+        ciphertext, nonce, salt, header = _parse_container(data)
+        try:
+            return self._decrypt_raw(
+                ciphertext, nonce, salt, header['metadata'], password, associated_data
+            )
+        finally:
+            ciphertext.release()
+            nonce.release()
+            salt.release()
+    
     def decrypt(
         self,
         packet: EncryptedPacket,
@@ -231,27 +565,56 @@ class QuantumEncryptor:
         Raises:
             InvalidTag: Si la contraseña es incorrecta o los datos fueron alterados
         """
-        import base64
-        
         # Decodificar componentes
         ciphertext = base64.b64decode(packet.ciphertext)
         nonce = base64.b64decode(packet.nonce)
         salt = base64.b64decode(packet.salt)
         
-        # Derivar clave usando el mismo salt
-        key = self.key_derivation.derive_key(
+        return self._decrypt_raw(
+            ciphertext, nonce, salt, packet.metadata, password, associated_data
+        )
+    
+    def _derive_packet_key(self, salt, metadata: Dict, password: str) -> bytes:
+        """Deriva la clave de un paquete con su salt, KDF e iteraciones (sin 'kdf': SHA-512)"""
+        return self.key_derivation.derive_key(
             password,
-            salt=salt,
-            iterations=self.iterations,
-            key_length=32
+            salt=bytes(salt),
+            iterations=int(metadata.get('iterations', self._legacy_iterations)),
+            key_length=32,
+            algorithm=metadata.get('kdf', KDF_PBKDF2_SHA512)
         )
+    
+    def _decrypt_raw(
+        self,
+        ciphertext,
+        nonce: bytes,
+        salt: bytes,
+        metadata: Dict,
+        password: str,
+        associated_data: Optional[bytes] = None
+    ) -> bytes:
+        """
+        Desencripta componentes binarios ya decodificados.
         
-        # Crear desencriptador AES-GCM
-        aesgcm = AESGCM(key)
+        Args:
+            ciphertext: Datos encriptados (cualquier objeto tipo bytes)
+            nonce: Nonce AES-GCM
+            salt: Salt de derivación
+            metadata: Metadata cuántica del paquete
+            password: Contraseña para derivar clave
+            associated_data: Datos adicionales autenticados (AAD)
+            
+        Returns:
+            Datos desencriptados
+        """
+        key = self._derive_packet_key(salt, metadata, password)
+        
+        # Desencriptador AES-GCM (reutilizado si la clave ya se usó)
+        aesgcm = self._aead(key)
         
         # Desencriptar
         try:
-            plaintext = aesgcm.decrypt(nonce, ciphertext, associated_data)
+            plaintext = aesgcm.decrypt(bytes(nonce), ciphertext, associated_data)
             return plaintext
         except InvalidTag:
             raise ValueError("Decryption failed: Invalid password or corrupted data")
@@ -269,14 +632,8 @@ class QuantumEncryptor:
         metadata = packet.metadata
         
         # Verificar campos requeridos
-        required_fields = [
-            'isotope', 'decay_type', 'h7_index', 'h7_pair',
-            'quantum_phase', 'mg_polarity', 'topology_state_index'
-        ]
-        
-        for field in required_fields:
-            if field not in metadata:
-                return False
+        if not _REQUIRED_METADATA_FIELDS.issubset(metadata):
+            return False
         
         # Verificar conservación H7
         h7_sum = metadata['h7_index'] + metadata['h7_pair']
@@ -284,8 +641,7 @@ class QuantumEncryptor:
             return False
         
         # Verificar isótopo válido
-        valid_isotopes = ['Sr90', 'Tc99m', 'Pu238']
-        if metadata['isotope'] not in valid_isotopes:
+        if metadata['isotope'] not in _VALID_ISOTOPES:
             return False
         
         # Verificar índice de estado topológico
@@ -303,13 +659,32 @@ class QuantumEncryptor:
             output_path: Ruta del archivo encriptado
             password: Contraseña
         """
-        with open(input_path, 'rb') as f:
-            plaintext = f.read()
+        key, nonce, salt, metadata = self._prepare_encryption(password)
+        encryptor = Cipher(algorithms.AES(key), modes.GCM(nonce)).encryptor()
         
-        packet = self.encrypt(plaintext, password)
+        header = _pack_container_header(
+            nonce, salt, metadata, time.time(), EncryptedPacket.version
+        )
         
-        with open(output_path, 'w') as f:
-            f.write(packet.to_json())
+        # AES-GCM incremental sobre la entrada mapeada; el resultado
+        # (ciphertext | tag) es idéntico al de AESGCM.encrypt. La salida va a un
+        # temporal: input_path == output_path no trunca la entrada antes de leerla
+        with _atomic_output(output_path) as dst, open(input_path, 'rb') as src:
+            dst.write(header)
+            dst.write(nonce)
+            dst.write(salt)
+            
+            if os.fstat(src.fileno()).st_size > 0:
+                with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    view = memoryview(mm)
+                    try:
+                        for i in range(0, len(view), GCM_CHUNK_SIZE):
+                            dst.write(encryptor.update(view[i:i + GCM_CHUNK_SIZE]))
+                    finally:
+                        view.release()
+            
+            dst.write(encryptor.finalize())
+            dst.write(encryptor.tag)
     
     def decrypt_file(self, input_path: str, output_path: str, password: str):
         """
@@ -320,10 +695,38 @@ class QuantumEncryptor:
             output_path: Ruta del archivo desencriptado
             password: Contraseña
         """
-        with open(input_path, 'r') as f:
-            packet = EncryptedPacket.from_json(f.read())
-        
-        plaintext = self.decrypt(packet, password)
-        
-        with open(output_path, 'wb') as f:
-            f.write(plaintext)
+        # Texto plano a un temporal: solo reemplaza output_path tras verificar el tag
+        with _atomic_output(output_path) as out, open(input_path, 'rb') as f:
+            if f.read(len(CONTAINER_MAGIC)) != CONTAINER_MAGIC:
+                # Formato JSON heredado
+                f.seek(0)
+                packet = EncryptedPacket.from_json(f.read())
+                out.write(self.decrypt(packet, password))
+                return
+            
+            # Contenedor binario mapeado: AES-GCM incremental con el tag final
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                ciphertext, nonce, salt, header = _parse_container(mm)
+                try:
+                    if len(ciphertext) < GCM_TAG_SIZE:
+                        raise ValueError("Decryption failed: Invalid password or corrupted data")
+                    
+                    key = self._derive_packet_key(salt, header['metadata'], password)
+                    body = ciphertext[:-GCM_TAG_SIZE]
+                    decryptor = Cipher(
+                        algorithms.AES(key),
+                        modes.GCM(bytes(nonce), bytes(ciphertext[-GCM_TAG_SIZE:]))
+                    ).decryptor()
+                    
+                    try:
+                        for i in range(0, len(body), GCM_CHUNK_SIZE):
+                            out.write(decryptor.update(body[i:i + GCM_CHUNK_SIZE]))
+                        out.write(decryptor.finalize())
+                    except InvalidTag:
+                        raise ValueError("Decryption failed: Invalid password or corrupted data")
+                    finally:
+                        body.release()
+                finally:
+                    ciphertext.release()
+                    nonce.release()
+                    salt.release()
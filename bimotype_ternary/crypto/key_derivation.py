@@ -10,15 +10,40 @@ Author: Jacobo Tlacaelel Mina Rodriguez
 """
 
 import hashlib
-import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from typing import Dict, List
 
-try:
-    from ..topology.encoder import CodificadorTopologicoBigEndian
-    from ..integration.mapper import TopologyBiMoTypeMapper
-    TOPOLOGY_AVAILABLE = True
-except ImportError:
-    TOPOLOGY_AVAILABLE = False
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDFExpand
+
+from ..topology.encoder import CodificadorTopologicoBigEndian
+from ..integration.mapper import TopologyBiMoTypeMapper
+
+# Algoritmos de derivación soportados (se registran en metadata['kdf'])
+KDF_PBKDF2_SHA512 = 'pbkdf2-sha512'
+KDF_PBKDF2_SHA256 = 'pbkdf2-sha256'
+KDF_SCRYPT = 'scrypt'
+SUPPORTED_KDFS = (KDF_PBKDF2_SHA512, KDF_PBKDF2_SHA256, KDF_SCRYPT)
+
+# Iteraciones PBKDF2 por defecto según el hash (recomendación OWASP);
+# scrypt no usa iteraciones
+LEGACY_ITERATIONS = 100000
+DEFAULT_ITERATIONS = {
+    KDF_PBKDF2_SHA512: 210000,
+    KDF_PBKDF2_SHA256: 600000,
+    KDF_SCRYPT: LEGACY_ITERATIONS
+}
+
+# Parámetros scrypt (memoria: 128 * r * n = 32 MiB)
+SCRYPT_N = 2 ** 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+# Claves derivadas recordadas por instancia (LRU)
+KEY_CACHE_SIZE = 64
 
 
 class QuantumKeyDerivation:
@@ -34,11 +59,27 @@ class QuantumKeyDerivation:
     
     def __init__(self):
         """Inicializa el derivador de claves cuánticas"""
-        if not TOPOLOGY_AVAILABLE:
-            raise ImportError("Topology encoder not available")
-        
         self.topology_encoder = CodificadorTopologicoBigEndian()
         self.mapper = TopologyBiMoTypeMapper()
+        
+        # Solo hay 6 estados topológicos: (estado, firma, salt) precalculados
+        self._precomputed_states = tuple(
+            (state, sig, self._build_state_salt(state, sig))
+            for state, sig in (
+                (s, self.mapper.create_radioactive_signature_from_topology(s))
+                for s in self.topology_encoder.topology_entries
+            )
+        )
+        
+        # Estados por conservación H7: (indice, pareja) → estado
+        self._h7_map = {
+            (s['indice'], s['pareja']): s for s in self.topology_encoder.topology_entries
+        }
+        self._h7_salt_suffixes = tuple(self._build_h7_salt_suffix(i) for i in range(8))
+        
+        # Caché LRU: (sha256(password), salt, iterations, key_length, algorithm) → clave
+        self._key_cache: OrderedDict = OrderedDict()
+        self._key_cache_lock = threading.Lock()
     
     def _create_topology_salt(self, password: str) -> bytes:
         """
@@ -50,16 +91,35 @@ class QuantumKeyDerivation:
         Returns:
             Salt de 32 bytes
         """
-        # Hash de la contraseña para seleccionar estado topológico
-        pwd_hash = hashlib.sha256(password.encode()).digest()
-        state_idx = pwd_hash[0] % 6  # 6 estados topológicos
-        
-        # Obtener estado topológico
-        state = self.topology_encoder.topology_entries[state_idx]
+        return self._create_topology_salt_from_hash(
+            hashlib.sha256(password.encode()).digest()
+        )
+    
+    def _create_topology_salt_from_hash(self, pwd_hash: bytes) -> bytes:
+        """
+        Crea el salt topológico desde el SHA-256 ya calculado de la contraseña.
         
-        # Crear firma radiactiva
-        sig = self.mapper.create_radioactive_signature_from_topology(state)
+        Args:
+            pwd_hash: SHA-256 de la contraseña
+            
+        Returns:
+            Salt de 32 bytes
+        """
+        # Hash de la contraseña para seleccionar estado topológico
+        return self._precomputed_states[pwd_hash[0] % 6][2]
+    
+    @staticmethod
+    def _build_state_salt(state: Dict, sig: Dict) -> bytes:
+        """
+        Construye el salt de 32 bytes de un estado topológico.
         
+        Args:
+            state: Estado topológico
+            sig: Firma radiactiva del estado
+            
+        Returns:
+            Salt de 32 bytes
+        """
         # Construir salt desde firma
         salt_components = (
             sig['isotope'].encode() +
@@ -70,16 +130,16 @@ class QuantumKeyDerivation:
         )
         
         # Hash para obtener salt de tamaño fijo
-        salt = hashlib.sha256(salt_components).digest()
-        
-        return salt
+        return hashlib.sha256(salt_components).digest()
     
     def derive_key(
         self,
         password: str,
         salt: bytes = None,
         iterations: int = 100000,
-        key_length: int = 32
+        key_length: int = 32,
+        algorithm: str = KDF_PBKDF2_SHA512,
+        password_hash: bytes = None
     ) -> bytes:
         """
         Deriva una clave de encriptación desde una contraseña.
@@ -87,23 +147,78 @@ class QuantumKeyDerivation:
         Args:
             password: Contraseña maestra
             salt: Salt (si None, se genera desde topología)
-            iterations: Número de iteraciones PBKDF2
+            iterations: Número de iteraciones PBKDF2 (ignorado con scrypt)
             key_length: Longitud de la clave en bytes (16, 32, 64)
+            algorithm: KDF a usar ('pbkdf2-sha512', 'pbkdf2-sha256', 'scrypt')
+            password_hash: SHA-256 de la contraseña, si ya se calculó
             
         Returns:
             Clave derivada
         """
+        pwd_bytes = password.encode()
+        if password_hash is None:
+            password_hash = hashlib.sha256(pwd_bytes).digest()
+        
         if salt is None:
-            salt = self._create_topology_salt(password)
-        
-        # PBKDF2 con HMAC-SHA512
-        key = hashlib.pbkdf2_hmac(
-            'sha512',
-            password.encode(),
-            salt,
-            iterations,
-            dklen=key_length
-        )
+            salt = self._create_topology_salt_from_hash(password_hash)
+        
+        # La caché se indexa por el hash de la contraseña, nunca por la contraseña
+        cache_key = (password_hash, salt, iterations, key_length, algorithm)
+        with self._key_cache_lock:
+            key = self._key_cache.get(cache_key)
+            if key is not None:
+                self._key_cache.move_to_end(cache_key)
+                return key
+        
+        key = self._derive_key_impl(pwd_bytes, salt, iterations, key_length, algorithm)
+        
+        with self._key_cache_lock:
+            self._key_cache[cache_key] = key
+            if len(self._key_cache) > KEY_CACHE_SIZE:
+                self._key_cache.popitem(last=False)
+        
+        return key
+    
+    @staticmethod
+    def _derive_key_impl(
+        pwd_bytes: bytes,
+        salt: bytes,
+        iterations: int,
+        key_length: int,
+        algorithm: str
+    ) -> bytes:
+        """Ejecuta el KDF (sin caché)"""
+        if algorithm == KDF_PBKDF2_SHA512:
+            # PBKDF2 con HMAC-SHA512
+            key = hashlib.pbkdf2_hmac(
+                'sha512',
+                pwd_bytes,
+                salt,
+                iterations,
+                dklen=key_length
+            )
+        elif algorithm == KDF_PBKDF2_SHA256:
+            # PBKDF2 con HMAC-SHA256 (extensiones SHA en x86-64 vía OpenSSL)
+            key = hashlib.pbkdf2_hmac(
+                'sha256',
+                pwd_bytes,
+                salt,
+                iterations,
+                dklen=key_length
+            )
+        elif algorithm == KDF_SCRYPT:
+            # scrypt: resistente a memoria
+            key = hashlib.scrypt(
+                pwd_bytes,
+                salt=salt,
+                n=SCRYPT_N,
+                r=SCRYPT_R,
+                p=SCRYPT_P,
+                maxmem=2 * 128 * SCRYPT_R * SCRYPT_N,
+                dklen=key_length
+            )
+        else:
+            raise ValueError(f"KDF no soportado: {algorithm}")
         
         return key
     
@@ -126,56 +241,82 @@ class QuantumKeyDerivation:
         Returns:
             Lista de claves derivadas
         """
-        keys = []
-        
-        for i in range(count):
+        def derive_one(i: int) -> bytes:
             # Crear salt único para cada clave
             salt_input = f"{master_password}:{i}".encode()
             salt = hashlib.sha256(salt_input).digest()
             
             # Derivar clave
-            key = self.derive_key(
+            return self.derive_key(
                 master_password,
                 salt=salt,
                 iterations=iterations,
                 key_length=key_length
             )
-            
-            keys.append(key)
         
-        return keys
+        workers = min(count, os.cpu_count() or 1)
+        if workers <= 1:
+            return [derive_one(i) for i in range(count)]
+        
+        # pbkdf2_hmac libera el GIL: las derivaciones corren en paralelo
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(derive_one, range(count)))
     
-    def derive_key_with_h7_conservation(
+    def derive_expanded_keys(
         self,
-        password: str,
-        h7_index: int,
+        master_password: str,
+        count: int,
+        key_length: int = 32,
         iterations: int = 100000,
-        key_length: int = 32
-    ) -> bytes:
+        algorithm: str = KDF_PBKDF2_SHA512
+    ) -> List[bytes]:
         """
-        Deriva una clave usando conservación H7 (index + pair = 7).
+        Deriva múltiples claves con un solo KDF + HKDF-Expand (RFC 5869).
+        
+        A diferencia de derive_multiple_keys (un KDF completo por clave),
+        aquí se deriva una clave maestra y se expande con HMAC-SHA256.
         
         Args:
-            password: Contraseña maestra
-            h7_index: Índice H7 (0-7)
-            iterations: Número de iteraciones
-            key_length: Longitud de la clave
+            master_password: Contraseña maestra
+            count: Número de claves a derivar
+            key_length: Longitud de cada clave en bytes
+            iterations: Número de iteraciones PBKDF2
+            algorithm: KDF para la clave maestra
             
         Returns:
-            Clave derivada
+            Lista de claves derivadas
         """
-        if not (0 <= h7_index <= 7):
-            raise ValueError("H7 index must be between 0 and 7")
+        master = self.derive_key(
+            master_password,
+            iterations=iterations,
+            key_length=32,
+            algorithm=algorithm
+        )
         
+        length = count * key_length
+        if length <= 0:
+            return []
+        
+        # HKDF-Expand de cryptography (limita length a 255 bloques SHA-256)
+        okm = HKDFExpand(hashes.SHA256(), length, b'quantum').derive(master)
+        
+        return [okm[j:j + key_length] for j in range(0, length, key_length)]
+    
+    def _build_h7_salt_suffix(self, h7_index: int) -> bytes:
+        """
+        Construye la parte fija (independiente de la contraseña) del salt H7.
+        
+        Args:
+            h7_index: Índice H7 (0-7)
+            
+        Returns:
+            índice + pareja + isótopo + fase cuántica, codificados
+        """
         # Calcular pareja H7
         h7_pair = 7 - h7_index
         
         # Obtener estado topológico correspondiente
-        state = None
-        for s in self.topology_encoder.topology_entries:
-            if s['indice'] == h7_index and s['pareja'] == h7_pair:
-                state = s
-                break
+        state = self._h7_map.get((h7_index, h7_pair))
         
         if state is None:
             # Crear estado sintético
@@ -191,16 +332,37 @@ class QuantumKeyDerivation:
         # Crear firma radiactiva
         sig = self.mapper.create_radioactive_signature_from_topology(state)
         
-        # Construir salt desde H7
-        salt_components = (
-            password.encode() +
+        return (
             str(h7_index).encode() +
             str(h7_pair).encode() +
             sig['isotope'].encode() +
             str(sig['quantum_phase']).encode()
         )
+    
+    def derive_key_with_h7_conservation(
+        self,
+        password: str,
+        h7_index: int,
+        iterations: int = 100000,
+        key_length: int = 32
+    ) -> bytes:
+        """
+        Deriva una clave usando conservación H7 (index + pair = 7).
+        
+        Args:
+            password: Contraseña maestra
+            h7_index: Índice H7 (0-7)
+            iterations: Número de iteraciones
+            key_length: Longitud de la clave
+            
+        Returns:
+            Clave derivada
+        """
+        if not (0 <= h7_index <= 7):
+            raise ValueError("H7 index must be between 0 and 7")
         
-        salt = hashlib.sha256(salt_components).digest()
+        # Construir salt desde H7 (sufijo fijo por índice, precalculado)
+        salt = hashlib.sha256(password.encode() + self._h7_salt_suffixes[h7_index]).digest()
         
         # Derivar clave
         key = self.derive_key(
@@ -12,8 +12,10 @@ Author: Jacobo Tlacaelel Mina Rodriguez
 import hashlib
 import secrets
 import math
-from typing import Dict, List, Optional
+import numpy as np
+from typing import Dict, List, Optional, Tuple
 from collections import Counter
+from functools import lru_cache
 
 try:
     from ..topology.encoder import CodificadorTopologicoBigEndian
@@ -22,6 +24,27 @@ try:
 except ImportError:
     TOPOLOGY_AVAILABLE = False
 
+# Longitud máxima con tabla p·log2(p) precalculada en estimate_entropy
+PLOG2P_MAX_LENGTH = 256
+
+
+@lru_cache(maxsize=None)
+def _plog2p_row(length: int) -> Tuple[float, ...]:
+    """
+    Tabla p·log2(p) con p = count/length para count = 0..length.
+    
+    Args:
+        length: Longitud de la contraseña
+        
+    Returns:
+        Tupla indexada por count (count = 0 → 0.0)
+    """
+    row = [0.0]
+    for count in range(1, length + 1):
+        p = count / length
+        row.append(p * math.log2(p))
+    return tuple(row)
+
 
 class QuantumPasswordGenerator:
     """
@@ -40,6 +63,11 @@ class QuantumPasswordGenerator:
     CHARSET_DIGITS = '0123456789'
     CHARSET_SYMBOLS = '!@#$%^&*()-_=+[]{}|;:,.<>?'
     
+    _LOWER_SET = frozenset(CHARSET_LOWERCASE)
+    _UPPER_SET = frozenset(CHARSET_UPPERCASE)
+    _DIGIT_SET = frozenset(CHARSET_DIGITS)
+    _SYMBOL_SET = frozenset(CHARSET_SYMBOLS)
+    
     CHARSET_PRESETS = {
         'lowercase': CHARSET_LOWERCASE,
         'uppercase': CHARSET_UPPERCASE,
@@ -57,24 +85,24 @@ class QuantumPasswordGenerator:
         
         self.topology_encoder = CodificadorTopologicoBigEndian()
         self.mapper = TopologyBiMoTypeMapper()
+        
+        # Las firmas de los 6 estados son fijas: se codifican una sola vez
+        self._signature_pool = self._build_signature_pool()
+        
+        # Tablas uint8 de los charsets predefinidos (todos ASCII) para el gather
+        self._charset_tables = {
+            name: np.frombuffer(chars.encode('ascii'), dtype=np.uint8)
+            for name, chars in self.CHARSET_PRESETS.items()
+        }
     
-    def _extract_quantum_entropy(self, num_bytes: int = 32) -> bytes:
+    def _build_signature_pool(self) -> bytes:
         """
-        Extrae entropía cuántica de estados topológicos y decaimiento radiactivo.
+        Codifica las firmas radiactivas de los 6 estados topológicos.
         
-        Args:
-            num_bytes: Número de bytes de entropía a generar
-            
         Returns:
-            Bytes de entropía cuántica
+            Firmas concatenadas, cada una con prefijo de longitud de 2 bytes
         """
-        entropy_pool = bytearray()
-        
-        # Usar secrets como fuente base (CSPRNG del sistema)
-        base_entropy = secrets.token_bytes(num_bytes)
-        entropy_pool.extend(base_entropy)
-        
-        # Mezclar con estados topológicos
+        pool = bytearray()
         for i in range(6):  # 6 estados topológicos
             state = self.topology_encoder.topology_entries[i]
             
@@ -89,12 +117,26 @@ class QuantumPasswordGenerator:
                 str(sig.get('energy_peak_ev', 0.0)).encode()
             )
             
-            # Hash para mezclar
-            h = hashlib.sha256(sig_bytes).digest()
-            entropy_pool.extend(h)
+            # Prefijo de longitud para que la concatenación no sea ambigua
+            pool += len(sig_bytes).to_bytes(2, 'big')
+            pool += sig_bytes
+        return bytes(pool)
+    
+    def _extract_quantum_entropy(self, num_bytes: int = 32) -> bytes:
+        """
+        Extrae entropía cuántica de estados topológicos y decaimiento radiactivo.
         
-        # Hash final para mezclar todo
-        final_entropy = hashlib.sha512(bytes(entropy_pool)).digest()
+        Args:
+            num_bytes: Número de bytes de entropía a generar
+            
+        Returns:
+            Bytes de entropía cuántica
+        """
+        # Usar secrets como fuente base (CSPRNG del sistema) y mezclar con las
+        # firmas de los estados topológicos (precalculadas) en un único SHA-512
+        final_entropy = hashlib.sha512(
+            secrets.token_bytes(num_bytes) + self._signature_pool
+        ).digest()
         
         return final_entropy[:num_bytes]
     
@@ -131,15 +173,13 @@ class QuantumPasswordGenerator:
         # Extraer entropía cuántica
         entropy = self._extract_quantum_entropy(length * 2)
         
-        # Generar contraseña
-        password = []
-        for i in range(length):
-            # Usar entropía cuántica para seleccionar carácter
-            byte_val = entropy[i % len(entropy)]
-            char_idx = byte_val % len(chars)
-            password.append(chars[char_idx])
-        
-        password_str = ''.join(password)
+        # Generar contraseña: entropía (cíclica si length > len(entropy)) → índice de carácter
+        char_idx = np.resize(np.frombuffer(entropy, dtype=np.uint8), length) % len(chars)
+        table = self._charset_table(charset, chars)
+        if table is not None:
+            password_str = table[char_idx].tobytes().decode('ascii')
+        else:
+            password_str = ''.join([chars[i] for i in char_idx.tolist()])
         
         # Asegurar complejidad si se requiere
         if ensure_complexity and charset in ['alphanumeric+symbols', 'all']:
@@ -147,6 +187,128 @@ class QuantumPasswordGenerator:
         
         return password_str
     
+    def generate_batch(
+        self,
+        count: int,
+        length: int = 16,
+        charset: str = 'alphanumeric+symbols',
+        ensure_complexity: bool = True
+    ) -> List[str]:
+        """
+        Genera varias contraseñas de una vez operando sobre una matriz (count × length).
+        
+        Args:
+            count: Número de contraseñas a generar
+            length: Longitud de cada contraseña
+            charset: Conjunto de caracteres (ver generate())
+            ensure_complexity: Asegurar que cada contraseña incluye cada tipo de carácter
+            
+        Returns:
+            Lista de contraseñas generadas
+        """
+        if length < 4:
+            raise ValueError("Password length must be at least 4 characters")
+        if count <= 0:
+            return []
+        
+        chars = self.CHARSET_PRESETS.get(charset, charset)
+        if not chars:
+            raise ValueError("Character set cannot be empty")
+        if not chars.isascii():
+            return [self.generate(length, charset, ensure_complexity) for _ in range(count)]
+        
+        # Un único flujo SHAKE-256 (CSPRNG + firmas topológicas) para todo el lote
+        table = self._charset_table(charset, chars)
+        batch = table[self._entropy_matrix(count, length) % len(table)]
+        
+        if ensure_complexity and charset in ['alphanumeric+symbols', 'all']:
+            self._ensure_complexity_batch(batch, charset)
+        
+        flat = batch.tobytes().decode()
+        return [flat[i:i + length] for i in range(0, count * length, length)]
+    
+    def _charset_table(self, charset: str, chars: str) -> Optional[np.ndarray]:
+        """
+        Tabla uint8 de un charset ASCII (precalculada para los predefinidos).
+        
+        Args:
+            charset: Nombre del charset o charset literal
+            chars: Caracteres del charset ya resueltos
+            
+        Returns:
+            Array uint8 con los caracteres, o None si el charset no es ASCII
+        """
+        table = self._charset_tables.get(charset)
+        if table is None and chars.isascii():
+            table = np.frombuffer(chars.encode('ascii'), dtype=np.uint8)
+        return table
+    
+    def _entropy_matrix(self, rows: int, cols: int) -> np.ndarray:
+        """
+        Matriz uint8 de entropía cuántica extraída de un único flujo SHAKE-256.
+        
+        Args:
+            rows: Número de filas
+            cols: Número de columnas
+            
+        Returns:
+            Matriz (rows × cols) de bytes de entropía
+        """
+        stream = hashlib.shake_256(
+            secrets.token_bytes(64) + self._signature_pool
+        ).digest(rows * cols)
+        return np.frombuffer(stream, dtype=np.uint8).reshape(rows, cols)
+    
+    def _ensure_complexity_batch(self, batch: np.ndarray, charset: str) -> None:
+        """
+        Versión vectorizada de _ensure_complexity sobre una matriz de contraseñas.
+        
+        Args:
+            batch: Matriz uint8 (count × length) con las contraseñas, se modifica in situ
+            charset: Conjunto de caracteres usado
+        """
+        required = [self.CHARSET_LOWERCASE, self.CHARSET_UPPERCASE, self.CHARSET_DIGITS]
+        if charset == 'alphanumeric+symbols':
+            required.append(self.CHARSET_SYMBOLS)
+        tables = [np.frombuffer(t.encode(), dtype=np.uint8) for t in required]
+        
+        # Cada tipo se sustituye en posiciones ≡ k (mod 4) para que las
+        # correcciones no se pisen; se repite con las filas que aún fallen
+        length = batch.shape[1]
+        slots = length // 4
+        pending = np.arange(batch.shape[0])
+        while pending.size:
+            sub = batch[pending]
+            missing = np.stack([~np.isin(sub, t).any(axis=1) for t in tables], axis=1)
+            failing = missing.any(axis=1)
+            pending, missing = pending[failing], missing[failing]
+            if not pending.size:
+                break
+            entropy = self._entropy_matrix(pending.size, len(tables))
+            for k, table in enumerate(tables):
+                rows = np.flatnonzero(missing[:, k])
+                ent = entropy[rows, k]
+                batch[pending[rows], (ent % slots) * 4 + k] = table[ent % len(table)]
+    
+    @classmethod
+    def _char_types(cls, password: str):
+        """
+        Detecta los tipos de carácter presentes en una contraseña.
+        
+        Args:
+            password: Contraseña a analizar
+            
+        Returns:
+            Tupla (has_lower, has_upper, has_digit, has_symbol)
+        """
+        pchars = set(password)
+        return (
+            not pchars.isdisjoint(cls._LOWER_SET),
+            not pchars.isdisjoint(cls._UPPER_SET),
+            not pchars.isdisjoint(cls._DIGIT_SET),
+            not pchars.isdisjoint(cls._SYMBOL_SET),
+        )
+    
     def _ensure_complexity(self, password: str, charset: str) -> str:
         """
         Asegura que la contraseña tiene al menos un carácter de cada tipo.
@@ -158,10 +320,7 @@ class QuantumPasswordGenerator:
         Returns:
             Contraseña con complejidad asegurada
         """
-        has_lower = any(c in self.CHARSET_LOWERCASE for c in password)
-        has_upper = any(c in self.CHARSET_UPPERCASE for c in password)
-        has_digit = any(c in self.CHARSET_DIGITS for c in password)
-        has_symbol = any(c in self.CHARSET_SYMBOLS for c in password)
+        has_lower, has_upper, has_digit, has_symbol = self._char_types(password)
         
         if charset == 'alphanumeric+symbols' or charset == 'all':
             if has_lower and has_upper and has_digit and has_symbol:
@@ -210,24 +369,17 @@ class QuantumPasswordGenerator:
         Returns:
             Contraseña generada determinísticamente
         """
-        # Hash del seed
-        seed_hash = hashlib.sha512(seed.encode()).digest()
-        
         # Obtener charset
         if charset in self.CHARSET_PRESETS:
             chars = self.CHARSET_PRESETS[charset]
         else:
             chars = charset
         
-        # Generar contraseña determinísticamente
-        password = []
-        for i in range(length):
-            # Usar hash del seed + índice
-            h = hashlib.sha256(seed_hash + i.to_bytes(4, 'big')).digest()
-            char_idx = h[0] % len(chars)
-            password.append(chars[char_idx])
+        # Flujo determinista: un byte de SHAKE-256 por carácter
+        stream = hashlib.shake_256(seed.encode()).digest(length)
+        n_chars = len(chars)
         
-        return ''.join(password)
+        return ''.join([chars[b % n_chars] for b in stream])
     
     def estimate_entropy(self, password: str) -> float:
         """
@@ -246,11 +398,16 @@ class QuantumPasswordGenerator:
         freq = Counter(password)
         length = len(password)
         
-        # Calcular entropía Shannon
+        # Calcular entropía Shannon (tabla para longitudes habituales)
         entropy = 0.0
-        for count in freq.values():
-            p = count / length
-            entropy -= p * math.log2(p)
+        if length <= PLOG2P_MAX_LENGTH:
+            row = _plog2p_row(length)
+            for count in freq.values():
+                entropy -= row[count]
+        else:
+            for count in freq.values():
+                p = count / length
+                entropy -= p * math.log2(p)
         
         # Entropía total = entropía por carácter * longitud
         total_entropy = entropy * length
@@ -270,10 +427,7 @@ class QuantumPasswordGenerator:
         length = len(password)
         
         # Detectar tipos de caracteres
-        has_lower = any(c in self.CHARSET_LOWERCASE for c in password)
-        has_upper = any(c in self.CHARSET_UPPERCASE for c in password)
-        has_digit = any(c in self.CHARSET_DIGITS for c in password)
-        has_symbol = any(c in self.CHARSET_SYMBOLS for c in password)
+        has_lower, has_upper, has_digit, has_symbol = self._char_types(password)
         
         # Calcular espacio de caracteres
         charset_size = 0
@@ -1,70 +1,241 @@
+import os
+import re
 import json
 import base64
+import hashlib
 import zlib
-import qrcode
+import queue
+import threading
+import importlib.util
+import multiprocessing
 from io import BytesIO
-import cv2
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import numpy as np
+from PIL import Image
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+# cv2, qrcode and pyzbar are imported where they are used: payload preparation
+# (e.g. a headless encoder) never touches them, and cv2 alone is slow to load
+ZBAR_AVAILABLE = importlib.util.find_spec("pyzbar") is not None
 try:
-    from pyzbar.pyzbar import decode
-    ZBAR_AVAILABLE = True
+    import segno
+    SEGNO_AVAILABLE = True
 except ImportError:
-    decode = None
-    ZBAR_AVAILABLE = False
+    SEGNO_AVAILABLE = False
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
 from bimotype_ternary.examples.generate_metriplectic_keys import MetriplecticKeyGenerator
 
+# QR rendering geometry (pixels per module, quiet-zone modules)
+QR_BOX_SIZE = 10
+QR_BORDER = 4
+# Below this many frames the process pool start-up costs more than it saves
+QR_POOL_MIN_FRAMES = 32
+# Display time of each frame in the animated QR (ms)
+QR_FRAME_MS = 150
+# Camera frames wider than this are downscaled before ZBar decoding
+QR_SCAN_MAX_WIDTH = 640
+# A camera that delivers no frame for this long ends the scan
+QR_SCAN_FRAME_TIMEOUT_S = 5.0
+
+# Payload: FORMAT | nonce (16) | AES-256-CTR(compressed data); the key is SHA-256 of the
+# first QR_KEY_SEED_LENGTH metriplectic keys. Untagged payloads are the legacy XOR cipher.
+QR_FORMAT_AES_CTR = 0x01       # zlib inside
+QR_FORMAT_AES_CTR_ZSTD = 0x02  # zstd inside (zstandard ships with the crypto extra)
+QR_ZSTD_LEVEL = 10
+QR_CTR_NONCE_SIZE = 16
+QR_KEY_SEED_LENGTH = 64
+
+
+def _keystream_bytes(keys: np.ndarray) -> np.ndarray:
+    """Legacy cipher key bytes: int(abs(key) * 1000) % 256 for each key."""
+    # abs() >= 0, so the int64 cast truncates like int() and the uint8 cast is the % 256
+    return (np.abs(keys) * 1000).astype(np.int64).astype(np.uint8)
+
+
+def _aes_ctr(key: bytes, nonce: bytes, data: bytes) -> bytes:
+    """AES-256-CTR (OpenSSL, AES-NI where available); encrypt and decrypt are the same op."""
+    ctx = Cipher(algorithms.AES(key), modes.CTR(nonce)).encryptor()
+    return ctx.update(data) + ctx.finalize()
+
+
+def _compress_payload(data: bytes):
+    """Compresses with zstd when available (fewer bytes → fewer frames), else zlib."""
+    if ZSTD_AVAILABLE:
+        return QR_FORMAT_AES_CTR_ZSTD, zstandard.ZstdCompressor(level=QR_ZSTD_LEVEL).compress(data)
+    return QR_FORMAT_AES_CTR, zlib.compress(data)
+
+
+def _decompress_payload(fmt: int, data: bytes) -> bytes:
+    """Inverse of _compress_payload for a tagged payload."""
+    if fmt == QR_FORMAT_AES_CTR:
+        return zlib.decompress(data)
+    if not ZSTD_AVAILABLE:
+        raise ValueError("This QR transfer is zstd-compressed; install the 'zstandard' package")
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+_DECOMPRESS_ERRORS = (zlib.error, ValueError) + ((zstandard.ZstdError,) if ZSTD_AVAILABLE else ())
+
+
+def _encode_frame_matrix(frame_data: str, version: int = None) -> np.ndarray:
+    """
+    QR module matrix (True = dark, no quiet zone) for one frame at ERROR_CORRECT_L.
+    Module-level so it can run in a worker process; the result is cheap to pickle.
+    A known version skips the best-fit search; None fits the smallest version.
+    """
+    if SEGNO_AVAILABLE:
+        # segno runs Reed-Solomon and mask scoring at C speed
+        qr = segno.make(frame_data, error='l', version=version, micro=False, boost_error=False)
+        return np.asarray(qr.matrix, dtype=bool)
+    
+    import qrcode
+    qr = qrcode.QRCode(
+        version=version, # None: auto
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        border=0,
+    )
+    qr.add_data(frame_data)
+    qr.make(fit=version is None)
+    return np.asarray(qr.get_matrix(), dtype=bool)
+
+
+def _matrix_version(dark: np.ndarray) -> int:
+    """QR version from the matrix side (17 + 4 * version modules)."""
+    return (dark.shape[0] - 17) // 4
+
+
+def _matrix_image(dark: np.ndarray, box_size: int = QR_BOX_SIZE, border: int = QR_BORDER):
+    """Renders a module matrix as a black-on-white PIL image."""
+    pixels = np.where(np.pad(dark, border), 0, 255).astype(np.uint8)
+    pixels = pixels.repeat(box_size, axis=0).repeat(box_size, axis=1)
+    return Image.fromarray(pixels).convert('1')
+
+
+def _prepare_scan_frame(frame: np.ndarray) -> np.ndarray:
+    """
+    Grayscale, aspect-preserving downscale of a camera frame for pyzbar.
+    ZBar cost grows with pixel count and it only reads one 8-bit channel anyway.
+    """
+    import cv2
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    height, width = frame.shape[:2]
+    if width > QR_SCAN_MAX_WIDTH:
+        scale = QR_SCAN_MAX_WIDTH / width
+        frame = cv2.resize(frame, (QR_SCAN_MAX_WIDTH, max(1, round(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+    return frame
+
+
+def _offer_latest(frames: queue.Queue, item):
+    """Puts item, evicting the oldest queued frame when the consumer is behind."""
+    try:
+        frames.put_nowait(item)
+    except queue.Full:
+        try:
+            frames.get_nowait()
+        except queue.Empty:
+            pass
+        # Only the producer puts, so there is room now
+        frames.put_nowait(item)
+
+
+def _capture_loop(cap, frames: queue.Queue, stop: threading.Event):
+    """
+    Camera producer: reads frames off the main thread so camera I/O overlaps decoding.
+    Pushes None when the camera stops delivering frames.
+    The producer owns the capture and releases it after its last read() returns,
+    so it is never released while a read is still in flight.
+    """
+    try:
+        while not stop.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                _offer_latest(frames, None)
+                return
+            _offer_latest(frames, frame)
+    finally:
+        cap.release()
+
+
 class QRTransferProtocol:
     """
     Protocol for offline file transfer using Animated QR codes
     and Metriplectic Encryption.
     """
+    # BIMO_QR|filename|frame_idx|total_frames|payload_chunk, for str and raw scanner bytes
+    _FRAME_RE = re.compile(r"BIMO_QR\|([^|]*)\|(\d+)\|(\d+)\|(.*)", re.S)
+    _FRAME_RE_BYTES = re.compile(rb"BIMO_QR\|([^|]*)\|(\d+)\|(\d+)\|(.*)", re.S)
+
     def __init__(self, h7_index: int, chunk_size: int = 400):
         # We use a smaller chunk_size (e.g. 400 bytes) for better QR readability on screens
         self.h7_index = h7_index
         self.chunk_size = chunk_size
         self.key_gen = MetriplecticKeyGenerator(h7_index)
+        # The key sequence depends only on (h7_index, position): keep the longest one and slice
+        self._key_cache = np.empty(0, dtype=np.complex128)
+        self._keystream = np.empty(0, dtype=np.uint8)
+        self._transfer_key = None
+
+    def _key_sequence(self, n: int) -> np.ndarray:
+        """
+        Returns the first n keys, regenerating only when a longer sequence is needed.
+        """
+        if n > len(self._key_cache):
+            self._key_cache = np.asarray(self.key_gen.generate_key_sequence(n))
+        return self._key_cache[:n]
+
+    def _ensure_keystream(self, n: int) -> np.ndarray:
+        """
+        Returns the first n legacy keystream bytes, doubling the cached buffer when it is too short.
+        """
+        if n > len(self._keystream):
+            size = max(n, 2 * len(self._keystream))
+            self._keystream = _keystream_bytes(self._key_sequence(size))
+        return self._keystream[:n]
+
+    def _aes_key(self) -> bytes:
+        """AES-256 key for this h7_index: SHA-256 of the little-endian key sequence prefix."""
+        if self._transfer_key is None:
+            seed = self._key_sequence(QR_KEY_SEED_LENGTH).astype('<c16').tobytes()
+            self._transfer_key = hashlib.sha256(seed).digest()
+        return self._transfer_key
 
     def prepare_payload(self, file_bytes: bytes, filename: str) -> list[str]:
         """
         Compresses, encrypts, and chunks a file into QR-ready payload strings.
         """
         # 1. Compress
-        compressed_data = zlib.compress(file_bytes)
-        
-        # 2. Encrypt (Using generated keys)
-        # Generate enough keys to cover the byte length
-        keys = self.key_gen.generate_key_sequence(len(compressed_data))
-        
-        # Simple modulo/XOR byte encryption (One-Time Pad simulation)
-        encrypted_bytes = bytearray()
-        for i in range(len(compressed_data)):
-            k = int(abs(keys[i]) * 1000) % 256
-            encrypted_bytes.append(compressed_data[i] ^ k)
-
-        # 3. Base64 encode
-        b64_data = base64.b64encode(encrypted_bytes).decode('utf-8')
+        fmt, compressed_data = _compress_payload(file_bytes)
         
-        # 4. Chunking
-        total_len = len(b64_data)
-        chunks = []
-        for i in range(0, total_len, self.chunk_size):
-            chunks.append(b64_data[i:i + self.chunk_size])
+        # 2. Encrypt (AES-CTR keyed from the metriplectic sequence, fresh nonce per transfer)
+        nonce = os.urandom(QR_CTR_NONCE_SIZE)
+        encrypted_bytes = (
+            bytes([fmt]) + nonce + _aes_ctr(self._aes_key(), nonce, compressed_data)
+        )
 
-        total_frames = len(chunks)
+        # 3. Base64 encode (ASCII: no UTF-8 codec pass needed)
+        b64_data = base64.b64encode(encrypted_bytes).decode('ascii')
         
-        # 5. Format into QR frames
+        # 4. Chunking + 5. Format into QR frames, slicing straight into each frame
         # Format: BIMO_QR|filename|frame_idx|total_frames|payload_chunk
-        qr_frames = []
-        for idx, chunk in enumerate(chunks):
-            header = f"BIMO_QR|{filename}|{idx}|{total_frames}|"
-            qr_frames.append(header + chunk)
+        cs = self.chunk_size
+        total_frames = -(-len(b64_data) // cs)
+        qr_frames = [
+            f"BIMO_QR|{filename}|{idx}|{total_frames}|{b64_data[idx * cs:(idx + 1) * cs]}"
+            for idx in range(total_frames)
+        ]
             
         return qr_frames
 
     def reconstruct_payload(self, frames: dict) -> bytes:
         """
         Reconstructs, decrypts, and decompresses the payload from collected QR frames.
-        frames is a dict: {frame_idx (int): "payload_chunk"}
+        frames is a dict: {frame_idx (int): "payload_chunk"} (str or bytes chunks)
         returns: Tuple(filename, decrypted_bytes)
         """
         if not frames:
@@ -78,76 +249,150 @@ class QRTransferProtocol:
             raise ValueError(f"Missing frames. Have {len(frames)} but highest index is {sorted_indices[-1]}")
 
         # Assemble the base64 chunks
-        full_b64 = "".join([frames[idx] for idx in sorted_indices])
+        chunks = [frames[idx] for idx in sorted_indices]
+        full_b64 = (b"" if isinstance(chunks[0], (bytes, bytearray)) else "").join(chunks)
         
         # 1. Base64 Decode
         try:
-            encrypted_bytes = bytearray(base64.b64decode(full_b64))
+            encrypted_bytes = base64.b64decode(full_b64)
         except Exception as e:
              raise ValueError(f"Error decoding base64: {e}")
 
-        # 2. Decrypt
-        keys = self.key_gen.generate_key_sequence(len(encrypted_bytes))
-        decrypted_bytes = bytearray()
-        for i in range(len(encrypted_bytes)):
-            k = int(abs(keys[i]) * 1000) % 256
-            decrypted_bytes.append(encrypted_bytes[i] ^ k)
+        # 2. Decrypt + 3. Decompress
+        header = 1 + QR_CTR_NONCE_SIZE
+        tagged_error = None
+        fmt = encrypted_bytes[0] if encrypted_bytes else None
+        if fmt in (QR_FORMAT_AES_CTR, QR_FORMAT_AES_CTR_ZSTD) and len(encrypted_bytes) > header:
+            nonce = encrypted_bytes[1:header]
+            try:
+                return _decompress_payload(fmt, _aes_ctr(self._aes_key(), nonce, encrypted_bytes[header:]))
+            except _DECOMPRESS_ERRORS as e:
+                tagged_error = e  # A legacy XOR payload may start with the same byte
+
+        # Legacy payloads: per-byte XOR with the key sequence
+        data = np.frombuffer(encrypted_bytes, dtype=np.uint8)
+        decrypted_bytes = (data ^ self._ensure_keystream(len(data))).tobytes()
             
-        # 3. Decompress
         try:
             original_bytes = zlib.decompress(decrypted_bytes)
         except Exception as e:
-            raise ValueError(f"Error decompressing data (Invalid Key / Corrupted payload?): {e}")
+            raise ValueError(
+                f"Error decompressing data (Invalid Key / Corrupted payload?): {tagged_error or e}"
+            )
             
         return original_bytes
 
+    def _iter_frame_matrices(self, frames: list[str]):
+        """
+        Yields the QR module matrix of each frame, in order.
+        Large frame sets are encoded across a process pool when one can be started.
+        """
+        if not frames:
+            return
+        
+        # Frames of the same length fit the same version: fit once, reuse it.
+        # Other lengths (more index digits, the short last frame) are fitted on their own.
+        first = _encode_frame_matrix(frames[0])
+        yield first
+        fitted = _matrix_version(first)
+        rest = frames[1:]
+        versions = [fitted if len(f) == len(frames[0]) else None for f in rest]
+        
+        if len(frames) >= QR_POOL_MIN_FRAMES:
+            # spawn, not fork: the callers (Streamlit, Flet workers) are threaded processes
+            ex = None
+            try:
+                ex = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+                results = ex.map(_encode_frame_matrix, rest, versions, chunksize=8)
+            except (OSError, RuntimeError, ValueError, BrokenProcessPool):
+                if ex is not None:
+                    ex.shutdown(wait=False, cancel_futures=True)
+                ex = None
+            if ex is not None:
+                with ex:
+                    yield from results
+                return
+        
+        # Serial path: small frame sets, or no process pool available
+        for f, v in zip(rest, versions):
+            yield _encode_frame_matrix(f, v)
+
+    def iter_qr_images(self, frames: list[str]):
+        """
+        Yields a PIL Image per QR frame payload as soon as it is encoded,
+        so callers can stream frames out without holding the whole set.
+        """
+        for dark in self._iter_frame_matrices(frames):
+            yield _matrix_image(dark)
+
     def generate_qr_images(self, frames: list[str]) -> list:
         """
         Generates PIL Image objects for each QR frame payload.
+        Large frame sets are encoded across a process pool.
         """
-        images = []
-        for frame_data in frames:
-            qr = qrcode.QRCode(
-                version=None, # auto
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(frame_data)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-            images.append(img)
-            
-        return images
+        return list(self.iter_qr_images(frames))
+
+    def generate_qr_animation(self, frames: list[str], frame_ms: int = QR_FRAME_MS) -> bytes:
+        """
+        Encodes all QR frames as one looping animated PNG (APNG), so a browser
+        can play the sequence natively from a single image.
+        Smaller QR versions (e.g. the last frame) are centred on the largest canvas.
+        """
+        # Pad the (small) module matrices rather than the rendered images
+        matrices = list(self._iter_frame_matrices(frames))
+        if not matrices:
+            return b""
+        
+        side = max(dark.shape[0] for dark in matrices)
+        images = [
+            # Versions differ by 4 modules, so the padding always splits evenly
+            _matrix_image(np.pad(dark, (side - dark.shape[0]) // 2))
+            for dark in matrices
+        ]
         
+        buf = BytesIO()
+        images[0].save(buf, format="PNG", save_all=True, append_images=images[1:],
+                       duration=frame_ms, loop=0)
+        return buf.getvalue()
+
     @staticmethod
-    def parse_qr_frame(qr_data: str):
+    def parse_qr_frame(qr_data):
         """
-        Parses a single QR string payload into its header components and data chunk.
+        Parses a single QR payload (str, or the raw bytes from the scanner) into its
+        header components and data chunk.
         Format: BIMO_QR|filename|frame_idx|total_frames|payload_chunk
         Returns: (filename, frame_idx, total_frames, chunk_data) or None if invalid.
+        chunk_data keeps the input type; filename is always str.
         """
-        if not qr_data.startswith("BIMO_QR|"):
-            return None
-            
-        parts = qr_data.split("|", 4)
-        if len(parts) != 5:
-            return None
-            
-        _, filename, frame_idx, total_frames, chunk_data = parts
-        try:
-            return filename, int(frame_idx), int(total_frames), chunk_data
-        except ValueError:
-            return None
+        if isinstance(qr_data, (bytes, bytearray)):
+            m = QRTransferProtocol._FRAME_RE_BYTES.fullmatch(qr_data)
+            if m is None:
+                return None
+            filename, frame_idx, total_frames, chunk_data = m.groups()
+            try:
+                filename = filename.decode("utf-8")
+            except UnicodeDecodeError:
+                return None
+        else:
+            m = QRTransferProtocol._FRAME_RE.fullmatch(qr_data)
+            if m is None:
+                return None
+            filename, frame_idx, total_frames, chunk_data = m.groups()
+        return filename, int(frame_idx), int(total_frames), chunk_data
 
     def scan_animated_qr_from_camera(self, camera_index: int = 0) -> bytes:
         """
         Opens the webcam to scan an animated QR sequence.
         Returns the decrypted bytes once all frames are collected.
         """
-        if not ZBAR_AVAILABLE:
+        try:
+            from pyzbar.pyzbar import decode
+        except ImportError:
+            decode = None
+        if not ZBAR_AVAILABLE or decode is None:
             print("Error: pyzbar or zbar shared library not available.")
             return None, None
+        import cv2
 
         cap = cv2.VideoCapture(camera_index)
         
@@ -157,17 +402,26 @@ class QRTransferProtocol:
         
         print("Starting camera... Point it at the Animated QR.")
 
+        # Capture on a background thread; decode + display stay on this (GUI) thread
+        captured = queue.Queue(maxsize=2)
+        stop = threading.Event()
+        producer = threading.Thread(target=_capture_loop, args=(cap, captured, stop), daemon=True)
+        producer.start()
+
         while True:
-            ret, frame = cap.read()
-            if not ret:
+            try:
+                frame = captured.get(timeout=QR_SCAN_FRAME_TIMEOUT_S)
+            except queue.Empty:
+                print("Camera stopped delivering frames.")
+                break
+            if frame is None:
                 break
                 
             # Decode QRs in the frame
-            decoded_objects = decode(frame)
+            decoded_objects = decode(_prepare_scan_frame(frame))
             for obj in decoded_objects:
-                qr_data = obj.data.decode("utf-8")
-                
-                parsed = self.parse_qr_frame(qr_data)
+                # Raw bytes: the base64 chunk is only decoded once, in reconstruct_payload
+                parsed = self.parse_qr_frame(obj.data)
                 if parsed:
                     filename, f_idx, tot, chunk = parsed
                     
@@ -200,7 +454,9 @@ class QRTransferProtocol:
                 print("Scan cancelled by user.")
                 break
                 
-        cap.release()
+        # The producer releases the camera itself once its pending read() returns
+        stop.set()
+        producer.join(timeout=1.0)
         cv2.destroyAllWindows()
         
         if expected_total and len(frames_collected) == expected_total:
@@ -1,8 +1,28 @@
 import os
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from .models import Base, SystemSession, RecursiveState, IdentityMetrics, AuditLog
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator
+
+# WAL: lectores concurrentes y un solo fsync por checkpoint en vez de dos por commit
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Aplica SQLITE_PRAGMAS a cada conexión nueva del pool."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
 
 class DatabaseManager:
     """
@@ -12,38 +32,76 @@ class DatabaseManager:
     
     def __init__(self, db_path: str = "bimotype.sqlite3"):
         self.engine = create_engine(f"sqlite:///{db_path}")
-        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        event.listen(self.engine, "connect", _set_sqlite_pragmas)
+        # expire_on_commit=False: los objetos devueltos siguen legibles tras cerrar la sesión
+        self.SessionLocal = sessionmaker(
+            autocommit=False, autoflush=False, expire_on_commit=False, bind=self.engine
+        )
         # Crear tablas si no existen
         Base.metadata.create_all(bind=self.engine)
+        # create_all no añade índices nuevos a tablas ya existentes
+        for index in AuditLog.__table__.indexes:
+            index.create(bind=self.engine, checkfirst=True)
+        # Las sesiones no se borran: fingerprint → id se puede recordar
+        self._session_ids: Dict[str, int] = {}
 
     def get_session(self) -> Session:
         return self.SessionLocal()
 
-    def create_session_record(self, session_number: int, fingerprint: str) -> SystemSession:
-        """Busca o crea una entrada de sesión en la DB para evitar errores de integridad."""
+    @contextmanager
+    def session(self) -> Iterator[Session]:
+        """
+        Sesión para una operación lógica completa: una sola transacción.
+        Confirma al salir sin errores y revierte si hay una excepción.
+        
+        Uso:
+            with manager.session() as db:
+                manager.create_session_record(1, fp, db=db)
+                manager.add_audit_log(fp, "EVENT", "...", db=db)
+        """
         db = self.get_session()
         try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Ids resueltos en esta transacción pueden no existir tras el rollback
+            self._session_ids.clear()
+            raise
+        finally:
+            db.close()
+
+    @contextmanager
+    def _use_session(self, db: Optional[Session]) -> Iterator[Session]:
+        """Usa la sesión del llamador (que confirma él) o abre una transacción propia."""
+        if db is not None:
+            yield db
+        else:
+            with self.session() as own:
+                yield own
+
+    def create_session_record(self, session_number: int, fingerprint: str,
+                              db: Optional[Session] = None) -> SystemSession:
+        """Busca o crea una entrada de sesión en la DB para evitar errores de integridad."""
+        with self._use_session(db) as db:
             # Primero intentar buscar una sesión existente con el mismo fingerprint
             session = db.query(SystemSession).filter(SystemSession.fingerprint == fingerprint).first()
             
             if not session:
-                # Si no existe, crearla
+                # Si no existe, crearla (flush asigna el id dentro de la transacción)
                 session = SystemSession(
                     session_number=session_number,
                     fingerprint=fingerprint
                 )
                 db.add(session)
-                db.commit()
-                db.refresh(session)
+                db.flush()
             
             return session
-        finally:
-            db.close()
 
-    def save_recursive_state(self, fingerprint: str, payload: Dict[str, Any]):
+    def save_recursive_state(self, fingerprint: str, payload: Dict[str, Any],
+                             db: Optional[Session] = None):
         """Guarda o actualiza el estado de información para una sesión."""
-        db = self.get_session()
-        try:
+        with self._use_session(db) as db:
             session = db.query(SystemSession).filter(SystemSession.fingerprint == fingerprint).first()
             if not session:
                 return # O lanzar error
@@ -54,26 +112,19 @@ class DatabaseManager:
                 db.add(state)
             else:
                 state.payload = payload
-                
-            db.commit()
-        finally:
-            db.close()
 
-    def get_latest_state(self) -> Optional[Dict[str, Any]]:
+    def get_latest_state(self, db: Optional[Session] = None) -> Optional[Dict[str, Any]]:
         """Busca el estado de la última sesión exitosa."""
-        db = self.get_session()
-        try:
+        with self._use_session(db) as db:
             latest_session = db.query(SystemSession).order_by(SystemSession.id.desc()).first()
             if latest_session and latest_session.state:
                 return latest_session.state.payload
             return None
-        finally:
-            db.close()
 
-    def record_identity(self, fingerprint: str, metrics: Dict[str, Any], o_n: float):
+    def record_identity(self, fingerprint: str, metrics: Dict[str, Any], o_n: float,
+                        db: Optional[Session] = None):
         """Registra el hardware y su modulación áurea."""
-        db = self.get_session()
-        try:
+        with self._use_session(db) as db:
             # Evitar duplicados por fingerprint
             if db.query(IdentityMetrics).filter(IdentityMetrics.fingerprint == fingerprint).first():
                 return
@@ -87,21 +138,43 @@ class DatabaseManager:
                 o_n_parameter=o_n
             )
             db.add(identity)
-            db.commit()
-        finally:
-            db.close()
 
-    def add_audit_log(self, fingerprint: str, event_type: str, description: str):
+    def _resolve_session_ids(self, db: Session, fingerprints) -> Dict[str, int]:
+        """Resuelve fingerprint → id de sesión (una consulta para los no cacheados)."""
+        missing = [fp for fp in set(fingerprints) if fp not in self._session_ids]
+        if missing:
+            rows = db.query(SystemSession.fingerprint, SystemSession.id).filter(
+                SystemSession.fingerprint.in_(missing)
+            ).all()
+            self._session_ids.update(rows)
+        return self._session_ids
+
+    def add_audit_log(self, fingerprint: str, event_type: str, description: str,
+                      db: Optional[Session] = None):
         """Añade un rastro de auditoría."""
-        db = self.get_session()
-        try:
-            session = db.query(SystemSession).filter(SystemSession.fingerprint == fingerprint).first()
-            log = AuditLog(
-                session_id=session.id if session else None,
-                event_type=event_type,
-                description=description
-            )
-            db.add(log)
-            db.commit()
-        finally:
-            db.close()
+        self.add_audit_logs([{
+            'fingerprint': fingerprint,
+            'event_type': event_type,
+            'description': description
+        }], db=db)
+
+    def add_audit_logs(self, rows: List[Dict[str, Any]], db: Optional[Session] = None):
+        """
+        Añade varios rastros de auditoría en una sola transacción.
+        
+        Args:
+            rows: Diccionarios con 'fingerprint', 'event_type' y 'description'
+            db: Sesión del llamador (opcional); sin ella se abre y confirma una propia
+        """
+        if not rows:
+            return
+        with self._use_session(db) as db:
+            session_ids = self._resolve_session_ids(db, (row['fingerprint'] for row in rows))
+            db.bulk_insert_mappings(AuditLog, [
+                {
+                    'session_id': session_ids.get(row['fingerprint']),
+                    'event_type': row['event_type'],
+                    'description': row['description']
+                }
+                for row in rows
+            ])
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, Index
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -56,6 +56,8 @@ class AuditLog(Base):
     Componente de Disipación: Registro de eventos irreversibles.
     """
     __tablename__ = 'audit_logs'
+    # Los eventos se consultan por sesión (relación SystemSession.audit_events)
+    __table_args__ = (Index('ix_audit_session', 'session_id'),)
     
     id = Column(Integer, primary_key=True)
     session_id = Column(Integer, ForeignKey('sessions.id'))
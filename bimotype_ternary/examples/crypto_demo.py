@@ -118,6 +118,7 @@ def demo_file_encryption():
     print("=" * 80)
     
     import tempfile
+    import filecmp
     import os
     
     encryptor = QuantumEncryptor(iterations=10000)
@@ -143,14 +144,8 @@ def demo_file_encryption():
         encryptor.decrypt_file(encrypted_file, decrypted_file, password)
         print(f"✓ Decrypted to {os.path.basename(decrypted_file)}")
         
-        # Verificar contenido
-        with open(temp_file, 'r') as f:
-            original = f.read()
-        
-        with open(decrypted_file, 'r') as f:
-            recovered = f.read()
-        
-        assert original == recovered
+        # Verificar contenido (comparación por bloques de 8 KiB, sin cargar los archivos)
+        assert filecmp.cmp(temp_file, decrypted_file, shallow=False)
         print("✓ File content verified!")
         
     finally:
@@ -1,6 +1,5 @@
 import json
 from bimotype_ternary.core.session_manager import SessionManager
-from bimotype_ternary.database.manager import DatabaseManager
 
 def run_db_demo():
     print(f"\n{'='*60}")
@@ -25,24 +24,31 @@ def run_db_demo():
 
     # 2. Consultar directamente la Base de Datos para auditoría
     print("\n--- Consulta de Auditoría (Directo desde DB) ---")
-    db_mgr = DatabaseManager(db_file)
-    session = db_mgr.get_session()
+    # Reutilizar el DatabaseManager (engine WAL) del SessionManager
+    db_mgr = sm.engine.db
     
+    from sqlalchemy import select
     from bimotype_ternary.database.models import IdentityMetrics, AuditLog
 
-    # Ver identidad
-    identity = session.query(IdentityMetrics).first()
-    if identity:
-        print(f"Identidad Detectada: {identity.node_name} ({identity.system_os})")
-        print(f"Parámetro O_n: {identity.o_n_parameter}")
+    with db_mgr.session() as session:
+        # Solo columnas: filas ligeras, sin hidratar objetos ORM
+        # Ver identidad
+        identity_row = session.execute(
+            select(IdentityMetrics.node_name, IdentityMetrics.system_os, IdentityMetrics.o_n_parameter)
+        ).first()
+        if identity_row:
+            node_name, system_os, o_n_parameter = identity_row
+            print(f"Identidad Detectada: {node_name} ({system_os})")
+            print(f"Parámetro O_n: {o_n_parameter}")
+        
+        # Ver logs (todos, también los sin sesión o de otras identidades)
+        log_rows = session.execute(
+            select(AuditLog.timestamp, AuditLog.event_type, AuditLog.description)
+        ).all()
+        print(f"\nLogs de Auditoría encontrados: {len(log_rows)}")
+        for timestamp, event_type, description in log_rows:
+            print(f"  [{timestamp}] {event_type}: {description}")
     
-    # Ver logs
-    logs = session.query(AuditLog).all()
-    print(f"\nLogs de Auditoría encontrados: {len(logs)}")
-    for log in logs:
-        print(f"  [{log.timestamp}] {log.event_type}: {log.description}")
-    
-    session.close()
     print(f"{'='*60}\n")
 
 if __name__ == "__main__":
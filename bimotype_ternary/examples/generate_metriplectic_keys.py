@@ -1,5 +1,4 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
 def aureo_operator(n: int, phi: float = 1.6180339887):
     """Cálculo independiente del operador áureo (Regla 2.1)."""
@@ -49,6 +48,8 @@ class MetriplecticKeyGenerator:
 
     def plot_diagnostics(self):
         """Regla 3.3: Visualización de la competencia entre términos."""
+        import matplotlib.pyplot as plt
+        
         plt.figure(figsize=(12, 6))
         plt.plot(self.history["symp"], label="Comp. Simpléctica (L_symp)", color="cyan", alpha=0.8)
         plt.plot(self.history["metr"], label="Comp. Métrica (L_metr)", color="magenta", alpha=0.8)
@@ -2,8 +2,6 @@ import streamlit as st
 import time
 import os
 import sys
-import json
-import io
 import base64
 
 # Añadir el directorio padre al sys.path para permitir ejecución de streamlit y resolver imports
@@ -14,7 +12,6 @@ if parent_dir not in sys.path:
 
 from bimotype_ternary.network.p2p import MetriplecticPeer
 from bimotype_ternary.network.discovery import PeerDiscovery
-from bimotype_ternary.crypto.qr_transfer import QRTransferProtocol
 
 try:
     from streamlit.runtime.scriptrunner import add_script_run_ctx
@@ -46,6 +43,11 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def _qr_protocol(h7_index: int):
+    """QR transfer is imported on first use: chat-only sessions never load it."""
+    from bimotype_ternary.crypto.qr_transfer import QRTransferProtocol
+    return QRTransferProtocol(h7_index=h7_index, chunk_size=400)
+
 # Session State Initialization
 if "messages" not in st.session_state:
     st.session_state.messages = []
@@ -123,20 +125,20 @@ with tab1:
         st.divider()
         
         st.subheader("Descubrimiento P2P")
-        if os.path.exists("peer_cache.json"):
-            with open("peer_cache.json", "r") as f:
-                peers = json.load(f)
-                for fp in peers:
-                    if fp != st.session_state.local_fp:
-                        is_trusted = fp in st.session_state.peer.trusted_peers
-                        label = f"💬 {fp[:8]}" if is_trusted else f"🤝 Vincular {fp[:8]}"
-                        if st.button(label, key=f"btn_{fp}"):
-                            st.session_state.target_fp = fp
-                            if not is_trusted:
-                                target_data = PeerDiscovery.resolve_peer(fp)
-                                if target_data:
-                                    st.session_state.peer.request_handshake(target_data[0], target_data[1])
-                                    st.info(f"Solicitud enviada a {fp[:8]}. Esperando respuesta...")
+        # Parsed once per change of peer_cache.json, not on every rerun
+        peers = PeerDiscovery.get_all_peers()
+        if peers:
+            for fp in peers:
+                if fp != st.session_state.local_fp:
+                    is_trusted = fp in st.session_state.peer.trusted_peers
+                    label = f"💬 {fp[:8]}" if is_trusted else f"🤝 Vincular {fp[:8]}"
+                    if st.button(label, key=f"btn_{fp}"):
+                        st.session_state.target_fp = fp
+                        if not is_trusted:
+                            target_data = PeerDiscovery.resolve_peer(fp)
+                            if target_data:
+                                st.session_state.peer.request_handshake(target_data[0], target_data[1])
+                                st.info(f"Solicitud enviada a {fp[:8]}. Esperando respuesta...")
         else:
             st.write("No se detectan otros pares.")
 
@@ -194,45 +196,30 @@ with tab2:
         if uploaded_file is not None:
             if st.button("Generar QR Animado"):
                 with st.spinner("Encriptando y fragmentando..."):
-                    protocol = QRTransferProtocol(h7_index=h7_seed_input, chunk_size=400)
+                    from bimotype_ternary.crypto.qr_transfer import QR_FRAME_MS
+                    protocol = _qr_protocol(h7_seed_input)
                     file_bytes = uploaded_file.read()
                     frames = protocol.prepare_payload(file_bytes, uploaded_file.name)
-                    images = protocol.generate_qr_images(frames)
+                    animation = protocol.generate_qr_animation(frames)
                     
                     st.success(f"Archivo dividido en {len(frames)} QRs.")
                     
-                    # Convert images to base64 for display in Streamlit
-                    b64_images = []
-                    for img in images:
-                        buf = io.BytesIO()
-                        img.save(buf, format="PNG")
-                        img_str = base64.b64encode(buf.getvalue()).decode()
-                        b64_images.append(img_str)
-                    
-                    # Pass the array to javascript to animate
-                    js_code = f"""
+                    # One looping APNG: the browser animates it natively (no per-frame JS payload)
+                    anim_b64 = base64.b64encode(animation).decode()
+                    html_code = f"""
                     <div id="qr-container" style="display:flex; justify-content:center; align-items:center; flex-direction:column;">
-                        <img id="qr-image" src="data:image/png;base64,{b64_images[0]}" width="300" height="300" />
-                        <h4 id="qr-counter">1 / {len(b64_images)}</h4>
+                        <img id="qr-image" src="data:image/png;base64,{anim_b64}" width="300" height="300" />
+                        <h4 id="qr-counter">{len(frames)} QRs · {QR_FRAME_MS} ms/QR</h4>
                     </div>
-                    <script>
-                        var frames = {json.dumps(b64_images)};
-                        var idx = 0;
-                        setInterval(function() {{
-                            idx = (idx + 1) % frames.length;
-                            document.getElementById('qr-image').src = "data:image/png;base64," + frames[idx];
-                            document.getElementById('qr-counter').innerText = (idx + 1) + " / " + frames.length;
-                        }}, 150); // Velocidad: 150ms per frame
-                    </script>
                     """
-                    st.components.v1.html(js_code, height=400)
+                    st.components.v1.html(html_code, height=400)
 
     with qr_col2:
         st.subheader("Recibir Archivo 📥")
         st.info("Apunta tu cámara al QR animado de tu contacto.")
         
         if st.button("📸 Abrir Escáner de Cámara"):
-            protocol = QRTransferProtocol(h7_index=h7_seed_input, chunk_size=400)
+            protocol = _qr_protocol(h7_seed_input)
             with st.spinner("Escaneando... Mira la ventana de la cámara de tu escritorio."):
                 file_bytes, filename = protocol.scan_animated_qr_from_camera()
                 
@@ -8,18 +8,91 @@ Decodes BiMoType packets with noise simulation.
 Author: Jacobo Tlacaelel Mina Rodriguez
 """
 
+import math
+from bisect import bisect_left
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from .mapper import TopologyBiMoTypeMapper
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Fidelidad mínima para aceptar un carácter decodificado
+FIDELITY_THRESHOLD = 0.7
+# cos²(d) > umbral  ⟺  |d| < acos(√umbral), con d reducido a [-π/2, π/2] (periodo π)
+FIDELITY_HALF_ANGLE = math.acos(math.sqrt(FIDELITY_THRESHOLD))
+
+# Calidad de decodificación: fidelidad media > umbral[i] → etiqueta[i + 1]
+_QUALITY_THRESHOLDS = (0.70, 0.85, 0.95)
+_QUALITY_LABELS = ('POOR', 'ACCEPTABLE', 'GOOD', 'EXCELLENT')
+
+
+def _fidelity_kernel_numpy(alpha: np.ndarray, beta: np.ndarray, phase: np.ndarray,
+                           noise_alpha: np.ndarray, noise_beta: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Fidelidad por carácter (0.0 si se rechaza) y máscara de aceptación, en una sola pasada."""
+    # Renormalizar el estado con ruido
+    alpha_noisy = alpha + noise_alpha
+    beta_noisy = beta + noise_beta
+    norm = np.hypot(alpha_noisy, beta_noisy)
+    alpha_noisy /= norm
+    beta_noisy /= norm
+    
+    # Reconstruir fase y calcular fidelidad
+    phase_reconstructed = 2.0 * np.arctan2(beta_noisy, alpha_noisy)
+    fidelities = np.cos((phase_reconstructed - phase) / 2.0) ** 2
+    
+    # Máscara aritmética (sin ramas): rechazado → fidelidad 0.0
+    accepted = fidelities > FIDELITY_THRESHOLD
+    fidelities *= accepted
+    return fidelities, accepted
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _fidelity_kernel_numba(alpha: np.ndarray, beta: np.ndarray, phase: np.ndarray,
+                               noise_alpha: np.ndarray, noise_beta: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Igual que _fidelity_kernel_numpy, fusionado en un solo bucle paralelo."""
+        n = alpha.shape[0]
+        fidelities = np.empty(n, dtype=np.float64)
+        accepted = np.empty(n, dtype=np.bool_)
+        for i in prange(n):
+            a = alpha[i] + noise_alpha[i]
+            b = beta[i] + noise_beta[i]
+            norm = math.sqrt(a * a + b * b)
+            a /= norm
+            b /= norm
+            half = (2.0 * math.atan2(b, a) - phase[i]) / 2.0
+            # Decisión por ángulo: el coseno solo se evalúa para los aceptados
+            half -= math.pi * math.floor(half / math.pi + 0.5)
+            if abs(half) < FIDELITY_HALF_ANGLE:
+                c = math.cos(half)
+                accepted[i] = True
+                fidelities[i] = c * c
+            else:
+                accepted[i] = False
+                fidelities[i] = 0.0
+        return fidelities, accepted
+    
+    _fidelity_kernel = _fidelity_kernel_numba
+else:
+    _fidelity_kernel = _fidelity_kernel_numpy
+
 class TernaryBiMoTypeDecoder:
     """
     Decodificador para paquetes Ternary-BiMoType
     """
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Args:
+            seed: Semilla del generador de ruido (PCG64); None = entropía del sistema
+        """
         self.topology_mapper = TopologyBiMoTypeMapper()
+        self._rng = np.random.default_rng(seed)
     
     def decode_bimotype_packet(
         self,
@@ -36,46 +109,41 @@ class TernaryBiMoTypeDecoder:
         Returns:
             Dict con mensaje decodificado y métricas
         """
-        decoded_chars = []
-        fidelities = []
+        states = packet['quantum_states']
+        n = len(states)
+        alpha = np.fromiter((qs['alpha'] for qs in states), dtype=np.float64, count=n)
+        beta = np.fromiter((qs['beta'] for qs in states), dtype=np.float64, count=n)
+        phase_original = np.fromiter((qs['phase'] for qs in states), dtype=np.float64, count=n)
+        
+        # 1. Simular ruido en el estado cuántico (columnas alpha, beta), una sola llamada
+        noise = self._rng.standard_normal((n, 2))
+        noise *= noise_level * 0.1
         
-        for qs in packet['quantum_states']:
-            # 1. Simular ruido en el estado cuántico
-            alpha_noisy = qs['alpha'] + np.random.normal(0, noise_level * 0.1)
-            beta_noisy = qs['beta'] + np.random.normal(0, noise_level * 0.1)
-            
-            # Renormalizar
-            norm = np.sqrt(alpha_noisy**2 + beta_noisy**2)
-            alpha_noisy /= norm
-            beta_noisy /= norm
-            
-            # 2. Reconstruir fase
-            phase_reconstructed = 2.0 * np.arctan2(beta_noisy, alpha_noisy)
-            
-            # 3. Calcular fidelidad
-            phase_original = qs['phase']
-            fidelity = np.cos((phase_reconstructed - phase_original) / 2.0) ** 2
-            
-            # 4. Decidir si aceptar el carácter
-            if fidelity > 0.7:
-                decoded_chars.append(qs['character'])
-                fidelities.append(fidelity)
+        # 2. Reconstruir fase + 3. Calcular fidelidad + 4. Decidir si aceptar cada carácter
+        fidelity, accepted = _fidelity_kernel(alpha, beta, phase_original, noise[:, 0], noise[:, 1])
+        decoded_message = ''.join([qs['character'] for qs in states])
+        if not accepted.all():
+            if len(decoded_message) == n and '\x00' not in decoded_message:
+                # Vista UCS-4 de un carácter por elemento: '?' por máscara, sin bucle
+                buf = np.array([decoded_message]).view('U1')
+                buf[~accepted] = '?'
+                decoded_message = buf.view(f'U{n}')[0]
             else:
-                decoded_chars.append('?')
-                fidelities.append(0.0)
+                decoded_message = ''.join([
+                    qs['character'] if ok else '?'
+                    for qs, ok in zip(states, accepted.tolist())
+                ])
+        fidelities = fidelity.tolist()
         
         # Métricas
         avg_fidelity = np.mean(fidelities) if fidelities else 0.0
         
         return {
-            'decoded_message': ''.join(decoded_chars),
+            'decoded_message': decoded_message,
             'original_message': packet['message'],
             'average_fidelity': avg_fidelity,
             'character_fidelities': fidelities,
-            'decoding_quality': 'EXCELLENT' if avg_fidelity > 0.95 else
-                               'GOOD' if avg_fidelity > 0.85 else
-                               'ACCEPTABLE' if avg_fidelity > 0.70 else
-                               'POOR',
+            'decoding_quality': _QUALITY_LABELS[bisect_left(_QUALITY_THRESHOLDS, avg_fidelity)],
             'noise_level': noise_level
         }
 
@@ -10,11 +10,15 @@ Author: Jacobo Tlacaelel Mina Rodriguez
 
 import numpy as np
 import time
-from typing import Dict, List
+import zlib
+from typing import Dict, List, Optional, Tuple
 from collections import Counter
 
 try:
-    from ..topology.encoder import CodificadorTopologicoBigEndian, CodificadorHexadecimalBigEndian
+    from ..topology.encoder import (
+        CodificadorTopologicoBigEndian,
+        CodificadorHexadecimalBigEndian
+    )
     TOPOLOGY_AVAILABLE = True
 except ImportError:
     TOPOLOGY_AVAILABLE = False
@@ -32,6 +36,12 @@ class TernaryBiMoTypeEncoder:
     Codificador que combina topología ternaria con BiMoType
     """
     
+    # Mapeo carácter → isótopo PSimon (simplificado); el resto usa 'H'
+    ISOTOPE_MAP = {
+        'H': 'H', 'D': 'D', 'T': 'T',
+        'A': 'He-3', 'B': 'He-4'
+    }
+    
     def __init__(self):
         self.topology_mapper = TopologyBiMoTypeMapper()
         
@@ -46,6 +56,10 @@ class TernaryBiMoTypeEncoder:
                     'peso_ternario': 1, 'fase_discreta_fragmento': 0
                 }
             ]
+        
+        # (índice topológico, isótopo) → (estado, firma, packed, hex): todo es
+        # determinista, así que cada combinación se calcula una sola vez
+        self._char_templates: Dict[Tuple[int, Optional[str]], Tuple[Dict, Dict, int, str]] = {}
     
     def encode_message_with_topology(
         self,
@@ -68,70 +82,88 @@ class TernaryBiMoTypeEncoder:
             Dict con encoding completo
         """
         encoded_chars = []
+        enrich = use_nuclear_isotopes and PSIMON_AVAILABLE
+        n_states = len(self.topology_entries)
         
         for i, char in enumerate(message.upper()):
             # 1. Seleccionar estado topológico (rotar por la tabla)
-            topo_idx = i % len(self.topology_entries)
-            topology_state = self.topology_entries[topo_idx].copy()
-            
             # 2. Si tenemos PSimon, enriquecer con datos nucleares
-            if use_nuclear_isotopes and PSIMON_AVAILABLE:
-                # Mapear char a isótopo (simplificado)
-                isotope_map = {
-                    'H': 'H', 'D': 'D', 'T': 'T',
-                    'A': 'He-3', 'B': 'He-4'
-                }
-                isotope_name = isotope_map.get(char, 'H')
-                nuclear_data = PSimonStub.get_isotope(isotope_name)
-                
-                if nuclear_data:
-                    # Enriquecer estado topológico con datos nucleares
-                    topology_state['nuclear_isotope'] = nuclear_data.name
-                    topology_state['h7_index'] = nuclear_data.h7_index
-                    topology_state['nuclear_chirality'] = nuclear_data.chirality_index
-                    
-                    # Actualizar fase discreta desde H7
-                    topology_state['fase_discreta_fragmento'] = nuclear_data.h7_index
-            
-            # 3. Crear firma radiactiva
-            radioactive_signature = self.topology_mapper.create_radioactive_signature_from_topology(
-                topology_state
+            isotope_name = self.ISOTOPE_MAP.get(char, 'H') if enrich else None
+            state, signature, packed_value, hex_encoding = self._char_template(
+                i % n_states, isotope_name
             )
             
-            # 4. Empaquetar en formato hexadecimal
-            if TOPOLOGY_AVAILABLE:
-                packed_value = CodificadorTopologicoBigEndian.empaquetar_topologia(
-                    topology_state['indice'],
-                    topology_state['pareja'],
-                    topology_state['winding'],
-                    topology_state['mapeo'],
-                    topology_state['peso_ternario'],
-                    topology_state['fase_discreta_fragmento']
-                )
-                hex_encoding = CodificadorHexadecimalBigEndian.a_hex_uint16(packed_value)
-            else:
-                packed_value = 0
-                hex_encoding = "0000"
+            # 3. Copias propias por carácter (la firma apunta a su estado)
+            topology_state = state.copy()
+            radioactive_signature = signature.copy()
+            radioactive_signature['topology_encoding'] = topology_state
             
-            # 5. Compilar datos del carácter
-            char_encoding = {
+            # 4. Compilar datos del carácter
+            encoded_chars.append({
                 'character': char,
                 'position': i,
                 'topology_state': topology_state,
                 'radioactive_signature': radioactive_signature,
                 'hex_encoding': hex_encoding,
                 'packed_value': packed_value
-            }
-            
-            encoded_chars.append(char_encoding)
+            })
         
         return {
             'message': message,
+            'message_crc32': zlib.crc32(message.encode('utf-8')),
             'encoded_characters': encoded_chars,
             'encoding_method': 'Ternary-BiMoType-Hybrid',
             'timestamp': time.time()
         }
     
+    def _char_template(self, topo_idx: int, isotope_name: Optional[str]) -> Tuple[Dict, Dict, int, str]:
+        """
+        Estado topológico, firma radiactiva y empaquetado de un carácter.
+        
+        Args:
+            topo_idx: Índice en la tabla de estados topológicos
+            isotope_name: Isótopo PSimon para enriquecer el estado (None = sin enriquecer)
+        
+        Returns:
+            Tupla (topology_state, radioactive_signature, packed_value, hex_encoding)
+        """
+        key = (topo_idx, isotope_name)
+        template = self._char_templates.get(key)
+        if template is not None:
+            return template
+        
+        topology_state = self.topology_entries[topo_idx].copy()
+        
+        nuclear_data = PSimonStub.get_isotope(isotope_name) if isotope_name is not None else None
+        if nuclear_data:
+            # Enriquecer estado topológico con datos nucleares
+            topology_state['nuclear_isotope'] = nuclear_data.name
+            topology_state['h7_index'] = nuclear_data.h7_index
+            topology_state['nuclear_chirality'] = nuclear_data.chirality_index
+            
+            # Actualizar fase discreta desde H7
+            topology_state['fase_discreta_fragmento'] = nuclear_data.h7_index
+        
+        radioactive_signature = self.topology_mapper.create_radioactive_signature_from_topology(
+            topology_state
+        )
+        
+        packed_value, hex_encoding = 0, "0000"
+        if TOPOLOGY_AVAILABLE:
+            packed_value = CodificadorTopologicoBigEndian.empaquetar_topologia(
+                topology_state['indice'],
+                topology_state['pareja'],
+                topology_state['winding'],
+                topology_state['mapeo'],
+                topology_state['peso_ternario'],
+                topology_state['fase_discreta_fragmento']
+            )
+            hex_encoding = CodificadorHexadecimalBigEndian.a_hex_uint16(packed_value)
+        
+        template = (topology_state, radioactive_signature, packed_value, hex_encoding)
+        self._char_templates[key] = template
+        return template
+    
     def create_bimotype_packet_from_ternary(
         self,
         encoded_message: Dict
@@ -140,21 +172,29 @@ class TernaryBiMoTypeEncoder:
         Crea un paquete BiMoType completo desde mensaje codificado ternario.
         """
         # Estados cuánticos para cada carácter
+        encoded_chars = encoded_message['encoded_characters']
+        n = len(encoded_chars)
         quantum_states = []
+        phases = np.fromiter(
+            (c['radioactive_signature']['quantum_phase'] for c in encoded_chars),
+            dtype=np.float64, count=n
+        )
+        energies = np.empty(n)
         
-        for char_enc in encoded_message['encoded_characters']:
+        # Estado cuántico: |ψ⟩ = cos(φ/2)|0⟩ + sin(φ/2)|1⟩ (un solo ufunc por lote)
+        half_phases = phases * 0.5
+        alphas = np.cos(half_phases).tolist()
+        betas = np.sin(half_phases).tolist()
+        
+        for k, (char_enc, alpha, beta, phase) in enumerate(
+                zip(encoded_chars, alphas, betas, phases.tolist())):
             sig = char_enc['radioactive_signature']
-            phase = sig['quantum_phase']
-            
-            # Estado cuántico: |ψ⟩ = cos(φ/2)|0⟩ + sin(φ/2)|1⟩
-            alpha = np.cos(phase / 2.0)
-            beta = np.sin(phase / 2.0)
             
             quantum_state = {
                 'character': char_enc['character'],
-                'alpha': float(alpha),
-                'beta': float(beta),
-                'phase': float(phase),
+                'alpha': alpha,
+                'beta': beta,
+                'phase': phase,
                 'isotope': sig['isotope'],
                 'energy': sig.get('energy_peak_ev', 0.0),
                 'decay_type': str(sig['decay_type']),
@@ -162,18 +202,24 @@ class TernaryBiMoTypeEncoder:
             }
             
             quantum_states.append(quantum_state)
+            energies[k] = quantum_state['energy']
+        
+        # CRC32 estable entre ejecuciones (hash() depende de PYTHONHASHSEED)
+        message_crc32 = encoded_message.get('message_crc32')
+        if message_crc32 is None:
+            message_crc32 = zlib.crc32(encoded_message['message'].encode('utf-8'))
         
         # Paquete completo
         packet = {
-            'packet_id': f"TERNARY-BIMO-{int(time.time())}-{abs(hash(encoded_message['message'])) % 10000:04d}",
+            'packet_id': f"TERNARY-BIMO-{int(time.time())}-{message_crc32 % 10000:04d}",
             'protocol': 'Ternary-BiMoType-v1.0',
             'timestamp': time.time(),
             'message': encoded_message['message'],
             'quantum_states': quantum_states,
             'encoding_metadata': {
                 'total_characters': len(quantum_states),
-                'total_energy_ev': sum(qs['energy'] for qs in quantum_states),
-                'average_phase': np.mean([qs['phase'] for qs in quantum_states]),
+                'total_energy_ev': float(energies.sum()),
+                'average_phase': phases.mean(),
                 'decay_types_distribution': self._count_decay_types(quantum_states)
             }
         }
@@ -183,9 +229,7 @@ class TernaryBiMoTypeEncoder:
     @staticmethod
     def _count_decay_types(quantum_states: List[Dict]) -> Dict:
         """Cuenta distribución de tipos de decaimiento"""
-        from collections import Counter
-        decay_types = [qs['decay_type'] for qs in quantum_states]
-        return dict(Counter(decay_types))
+        return dict(Counter(qs['decay_type'] for qs in quantum_states))
 
 
 # ============================================================================
@@ -9,7 +9,7 @@ Author: Jacobo Tlacaelel Mina Rodriguez
 """
 
 import numpy as np
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
 try:
     from ..core.datatypes import TipoDecaimiento, RADIOACTIVE_ISOTOPES
@@ -50,49 +50,112 @@ class TopologyBiMoTypeMapper:
     @staticmethod
     def create_radioactive_signature_from_topology(topology_state: Dict) -> Dict:
         """Crea una firma radiactiva BiMoType desde un estado topológico."""
-        peso = topology_state['peso_ternario']
-        decay_type = TopologyBiMoTypeMapper.TERNARY_TO_DECAY_TYPE[peso]
-        isotope = TopologyBiMoTypeMapper.DECAY_TO_ISOTOPE[decay_type]
-        
-        phase = TopologyBiMoTypeMapper.h7_index_to_phase(
-            topology_state['fase_discreta_fragmento']
+        return TopologyBiMoTypeMapper.create_radioactive_signature(
+            topology_state['peso_ternario'],
+            topology_state['fase_discreta_fragmento'],
+            topology_state['winding'],
+            topology_state['indice'],
+            topology_state['pareja'],
+            topology_state['mapeo'],
+            topology_state
         )
+    
+    @staticmethod
+    def create_radioactive_signature(
+        peso: int,
+        fase: int,
+        winding: int,
+        indice: int,
+        pareja: int,
+        mapeo: int,
+        topology_encoding: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Crea una firma radiactiva BiMoType desde los campos escalares del estado.
         
-        chirality_proxy = float(topology_state['peso_ternario'])
-        mg_polarity = TopologyBiMoTypeMapper.chirality_to_mg_polarity(chirality_proxy)
+        Args:
+            peso: Peso ternario (-1, 0, +1)
+            fase: Fase discreta del fragmento (índice H7)
+            winding: Número de enrollamiento
+            indice: Índice topológico
+            pareja: Pareja topológica
+            mapeo: Mapeo topológico
+            topology_encoding: Estado a adjuntar en la firma (None si no se necesita)
         
-        winding = topology_state['winding']
-        binding_energy_factor = 1.0 + (winding / 2.0) * 0.5
+        Returns:
+            Dict con la firma radiactiva
+        """
+        base = _SIGNATURE_BASES.get((peso, fase))
+        if base is None:
+            base = _SIGNATURE_BASES[(peso, fase)] = _signature_base(peso, fase)
+        signature = base.copy()
         
+        # Solo los campos que dependen de winding/indice/pareja/mapeo
         if DATATYPES_AVAILABLE:
-            iso_data = RADIOACTIVE_ISOTOPES[isotope]
-            tipo_map = {
-                'BETA': TipoDecaimiento.BETA,
-                'GAMMA': TipoDecaimiento.GAMMA,
-                'ALPHA': TipoDecaimiento.ALPHA
-            }
-            
-            signature = {
-                'isotope': isotope,
-                'energy_peak_ev': iso_data['energy_ev'] * binding_energy_factor,
-                'decay_type': tipo_map[decay_type],
-                'half_life_s': iso_data['half_life_years'] * 3.154e7,
-                'nuclear_spin': iso_data['spin'],
-                'mahalanobis_distance': float(topology_state['indice']) / 6.0,
-                'lambda_double_non_locality': float(topology_state['pareja']) / 6.0,
-                'mg_polarity': mg_polarity,
-                'mg_threshold': 0.5,
-                'vacuum_polarity_n_r': float(topology_state['mapeo']) * 0.1,
-                'quantum_phase': phase,
-                'topology_encoding': topology_state
-            }
-        else:
-            signature = {
-                'isotope': isotope,
-                'decay_type': decay_type,
-                'quantum_phase': phase,
-                'mg_polarity': mg_polarity,
-                'topology_encoding': topology_state
-            }
+            binding_energy_factor = 1.0 + (winding / 2.0) * 0.5
+            signature['energy_peak_ev'] *= binding_energy_factor
+            signature['mahalanobis_distance'] = float(indice) / 6.0
+            signature['lambda_double_non_locality'] = float(pareja) / 6.0
+            signature['vacuum_polarity_n_r'] = float(mapeo) * 0.1
+        signature['topology_encoding'] = topology_encoding
         
         return signature
+
+
+# Tipo de decaimiento (str) → TipoDecaimiento
+if DATATYPES_AVAILABLE:
+    DECAY_TYPE_ENUMS = {
+        'BETA': TipoDecaimiento.BETA,
+        'GAMMA': TipoDecaimiento.GAMMA,
+        'ALPHA': TipoDecaimiento.ALPHA
+    }
+
+
+def _signature_base(peso: int, fase: int) -> Dict:
+    """
+    Parte fija de una firma radiactiva, determinada solo por (peso, fase).
+    
+    Args:
+        peso: Peso ternario (-1, 0, +1)
+        fase: Fase discreta del fragmento (índice H7)
+    
+    Returns:
+        Dict con el orden de claves de la firma final; energy_peak_ev lleva la
+        energía sin factor de enlace y los campos por estado van a 0.0
+    """
+    decay_type = TopologyBiMoTypeMapper.TERNARY_TO_DECAY_TYPE[peso]
+    isotope = TopologyBiMoTypeMapper.DECAY_TO_ISOTOPE[decay_type]
+    phase = TopologyBiMoTypeMapper.h7_index_to_phase(fase)
+    mg_polarity = TopologyBiMoTypeMapper.chirality_to_mg_polarity(float(peso))
+    
+    if DATATYPES_AVAILABLE:
+        iso_data = RADIOACTIVE_ISOTOPES[isotope]
+        return {
+            'isotope': isotope,
+            'energy_peak_ev': iso_data['energy_ev'],
+            'decay_type': DECAY_TYPE_ENUMS[decay_type],
+            'half_life_s': iso_data['half_life_years'] * 3.154e7,
+            'nuclear_spin': iso_data['spin'],
+            'mahalanobis_distance': 0.0,
+            'lambda_double_non_locality': 0.0,
+            'mg_polarity': mg_polarity,
+            'mg_threshold': 0.5,
+            'vacuum_polarity_n_r': 0.0,
+            'quantum_phase': phase,
+            'topology_encoding': None
+        }
+    return {
+        'isotope': isotope,
+        'decay_type': decay_type,
+        'quantum_phase': phase,
+        'mg_polarity': mg_polarity,
+        'topology_encoding': None
+    }
+
+
+# (peso_ternario, fase H7) → parte fija de la firma; se precalcula la tabla 3x8
+_SIGNATURE_BASES: Dict[Tuple[int, int], Dict] = {
+    (peso, fase): _signature_base(peso, fase)
+    for peso in TopologyBiMoTypeMapper.TERNARY_TO_DECAY_TYPE
+    for fase in range(8)
+}
@@ -1,11 +1,12 @@
 import flet as ft
-import time
+import asyncio
 import os
 import json
 import sys
 import io
 import base64
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to sys.path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -18,6 +19,14 @@ from bimotype_ternary.network.discovery import PeerDiscovery
 from bimotype_ternary.crypto.qr_transfer import QRTransferProtocol
 
 
+def _png_b64(img) -> str:
+    """PNG data (base64) for one QR frame. Two-colour QR frames gain little
+    from heavy deflate, so the fastest level is used."""
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", compress_level=1)
+    return base64.b64encode(buf.getvalue()).decode()
+
+
 def main(page: ft.Page):
     page.title = "BiMoType Metriplectic Console"
     page.theme_mode = ft.ThemeMode.DARK
@@ -295,7 +304,7 @@ def main(page: ft.Page):
     animating     = False
     qr_frames_b64 = []
 
-    def animate_qr(max_loops: int = 3):
+    async def animate_qr(max_loops: int = 3):
         nonlocal animating
         if animating or not qr_frames_b64:
             return
@@ -310,7 +319,8 @@ def main(page: ft.Page):
                 f"{idx + 1} / {total}  "
                 f"(ciclo {loops_done + 1}/{max_loops})"
             )
-            page.update()
+            if qr_view.visible:       # pestaña oculta: nada que repintar
+                page.update()
 
             idx += 1
             if idx >= total:          # completó un ciclo completo
@@ -319,7 +329,7 @@ def main(page: ft.Page):
                 if loops_done >= max_loops:
                     break             # salir como GIF que terminó sus repeticiones
 
-            time.sleep(0.15)
+            await asyncio.sleep(0.15)
 
         # Al terminar: congelar en primer frame y liberar el flag
         animating = False
@@ -335,31 +345,33 @@ def main(page: ft.Page):
         animating = False
 
     def pick_files_result(e):
-        nonlocal qr_frames_b64
         if not e.files:
             return
         file_path = e.files[0].path
         filename  = e.files[0].name
-        try:
-            with open(file_path, "rb") as f:
-                file_bytes = f.read()
+        snack("Generando QRs...", ft.Colors.BLUE_700)
 
-            protocol = QRTransferProtocol(h7_index=state["h7_seed"], chunk_size=400)
-            frames   = protocol.prepare_payload(file_bytes, filename)
-            images   = protocol.generate_qr_images(frames)
+        def _build_frames():
+            nonlocal qr_frames_b64
+            try:
+                with open(file_path, "rb") as f:
+                    file_bytes = f.read()
 
-            qr_frames_b64 = []
-            for img in images:
-                buf = io.BytesIO()
-                img.save(buf, format="PNG")
-                qr_frames_b64.append(base64.b64encode(buf.getvalue()).decode())
+                protocol = QRTransferProtocol(h7_index=state["h7_seed"], chunk_size=400)
+                frames   = protocol.prepare_payload(file_bytes, filename)
 
-            snack(f"Archivo dividido en {len(frames)} QRs.", ft.Colors.GREEN_700)
-            threading.Thread(target=animate_qr, daemon=True).start()
+                # PNG encoding releases the GIL: overlap the frames across cores
+                with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+                    qr_frames_b64 = list(pool.map(_png_b64, protocol.iter_qr_images(frames)))
 
-        except Exception as ex:
-            snack(f"Error: {str(ex)}")
-        page.update()
+                snack(f"Archivo dividido en {len(frames)} QRs.", ft.Colors.GREEN_700)
+                page.run_task(animate_qr)
+
+            except Exception as ex:
+                snack(f"Error: {str(ex)}")
+
+        # Split + QR + PNG off the UI thread; snack() pushes the page update
+        threading.Thread(target=_build_frames, daemon=True).start()
 
     file_picker = ft.FilePicker()
     file_picker.on_result = pick_files_result
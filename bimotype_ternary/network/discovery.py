@@ -11,6 +11,10 @@ class PeerDiscovery:
     
     CACHE_FILE = "peer_cache.json"
     
+    # Parsed cache, reused until the file's (path, mtime_ns, size) changes
+    _cache = {}
+    _cache_stamp = None
+    
     @staticmethod
     def register_peer(fingerprint: str, host: str, port: int):
         cache = PeerDiscovery._load_cache()
@@ -30,17 +34,32 @@ class PeerDiscovery:
             return peer["host"], peer["port"]
         return None
 
+    @staticmethod
+    def _stamp():
+        path = PeerDiscovery.CACHE_FILE
+        st = os.stat(path)
+        return path, st.st_mtime_ns, st.st_size
+
     @staticmethod
     def _load_cache():
-        if os.path.exists(PeerDiscovery.CACHE_FILE):
+        try:
+            stamp = PeerDiscovery._stamp()
+        except OSError:
+            return {}
+        if stamp != PeerDiscovery._cache_stamp:
+            # Only re-read when another peer (or process) rewrote the file
             try:
-                with open(PeerDiscovery.CACHE_FILE, "r") as f:
-                    return json.load(f)
+                with open(stamp[0], "r") as f:
+                    cache = json.load(f)
             except:
                 return {}
-        return {}
+            PeerDiscovery._cache = cache
+            PeerDiscovery._cache_stamp = stamp
+        return dict(PeerDiscovery._cache)
 
     @staticmethod
     def _save_cache(cache):
         with open(PeerDiscovery.CACHE_FILE, "w") as f:
             json.dump(cache, f, indent=2)
+        PeerDiscovery._cache = dict(cache)
+        PeerDiscovery._cache_stamp = PeerDiscovery._stamp()
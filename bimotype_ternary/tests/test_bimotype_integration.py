@@ -12,6 +12,7 @@ Autor: Jacobo Tlacaelel Mina Rodriguez
 import pytest
 import numpy as np
 import json
+import zlib
 from bimotype_ternary.integration import (
     TopologyBiMoTypeMapper,
     TernaryBiMoTypeEncoder,
@@ -93,6 +94,21 @@ class TestTopologyBiMoTypeMapper:
         sig = TopologyBiMoTypeMapper.create_radioactive_signature_from_topology(topology_state)
         
         assert sig['isotope'] == 'H2'
+    
+    def test_create_radioactive_signature_scalars(self):
+        """Test forma escalar equivalente a la firma desde el estado"""
+        topology_state = {
+            'indice': 3, 'pareja': 4, 'winding': 2, 'mapeo': 1,
+            'peso_ternario': -1, 'fase_discreta_fragmento': 5
+        }
+        
+        from_state = TopologyBiMoTypeMapper.create_radioactive_signature_from_topology(topology_state)
+        from_scalars = TopologyBiMoTypeMapper.create_radioactive_signature(-1, 5, 2, 3, 4, 1)
+        
+        assert from_state['topology_encoding'] is topology_state
+        assert from_scalars['topology_encoding'] is None
+        from_state['topology_encoding'] = None
+        assert from_state == from_scalars
 
 
 class TestTernaryBiMoTypeEncoder:
@@ -122,6 +138,25 @@ class TestTernaryBiMoTypeEncoder:
             assert 'radioactive_signature' in char_enc
             assert 'hex_encoding' in char_enc
     
+    def test_encode_reuses_templates_with_own_copies(self):
+        """Test estados por carácter independientes aunque compartan plantilla"""
+        from bimotype_ternary.topology.encoder import CodificadorTopologicoBigEndian
+        
+        encoder = TernaryBiMoTypeEncoder()
+        n = len(encoder.topology_entries)
+        encoded = encoder.encode_message_with_topology("HTABD" * n)
+        chars = encoded['encoded_characters']
+        
+        for char_enc in chars:
+            state = char_enc['topology_state']
+            assert char_enc['radioactive_signature']['topology_encoding'] is state
+            fields = {k: state[k] for k in ('indice', 'pareja', 'winding', 'mapeo',
+                                            'peso_ternario', 'fase_discreta_fragmento')}
+            assert char_enc['packed_value'] == CodificadorTopologicoBigEndian.empaquetar_topologia(**fields)
+        
+        chars[0]['topology_state']['indice'] = -1
+        assert all(c['topology_state']['indice'] != -1 for c in chars[1:])
+    
     def test_create_bimotype_packet(self):
         """Test creación de paquete BiMoType"""
         encoder = TernaryBiMoTypeEncoder()
@@ -129,6 +164,7 @@ class TestTernaryBiMoTypeEncoder:
         packet = encoder.create_bimotype_packet_from_ternary(encoded)
         
         assert 'packet_id' in packet
+        assert packet['packet_id'].endswith(f"-{zlib.crc32(b'TEST') % 10000:04d}")
         assert 'protocol' in packet
         assert packet['protocol'] == 'Ternary-BiMoType-v1.0'
         assert packet['message'] == "TEST"
@@ -171,6 +207,25 @@ class TestTernaryBiMoTypeEncoder:
 class TestTernaryBiMoTypeDecoder:
     """Tests del decodificador ternario-BiMoType"""
     
+    def test_fidelity_kernel_numba_matches_numpy(self):
+        """Test kernel Numba (reducción módulo π) equivalente al de NumPy"""
+        pytest.importorskip("numba")
+        from bimotype_ternary.integration import decoder as decoder_module
+        
+        rng = np.random.default_rng(7)
+        n = 10000
+        # Fases fuera de [0, 2π] y ruido grande: ejercita la reducción y los rechazos
+        phase = rng.uniform(-4 * np.pi, 4 * np.pi, n)
+        alpha, beta = np.cos(phase / 2.0), np.sin(phase / 2.0)
+        noise = rng.standard_normal((2, n)) * 0.5
+        
+        expected = decoder_module._fidelity_kernel_numpy(alpha, beta, phase, noise[0], noise[1])
+        result = decoder_module._fidelity_kernel_numba(alpha, beta, phase, noise[0], noise[1])
+        
+        assert 0 < expected[1].sum() < n
+        np.testing.assert_array_equal(result[1], expected[1])
+        np.testing.assert_allclose(result[0], expected[0], rtol=1e-12, atol=1e-12)
+    
     def test_decode_without_noise(self):
         """Test decodificación sin ruido"""
         encoder = TernaryBiMoTypeEncoder()
@@ -211,6 +266,17 @@ class TestTernaryBiMoTypeDecoder:
         # Fidelidad debe estar entre 0 y 1
         assert 0.0 <= decoded['average_fidelity'] <= 1.0
         assert len(decoded['character_fidelities']) == 1
+    
+    def test_decode_seeded_noise_is_reproducible(self):
+        """Test ruido reproducible con semilla"""
+        encoder = TernaryBiMoTypeEncoder()
+        encoded = encoder.encode_message_with_topology("SEMILLA", use_nuclear_isotopes=False)
+        packet = encoder.create_bimotype_packet_from_ternary(encoded)
+        
+        a = TernaryBiMoTypeDecoder(seed=7).decode_bimotype_packet(packet, noise_level=0.8)
+        b = TernaryBiMoTypeDecoder(seed=7).decode_bimotype_packet(packet, noise_level=0.8)
+        assert a['character_fidelities'] == b['character_fidelities']
+        assert a['decoded_message'] == b['decoded_message']
 
 
 class TestTernaryBiMoTypeCodegen:
@@ -241,7 +307,26 @@ class TestTernaryBiMoTypeCodegen:
         assert 'topology_pack' in header
         assert 'create_radioactive_signature_from_topology' in header
         assert 'create_quantum_state_from_signature' in header
-    
+
+    def test_header_has_simd_hex_batch(self):
+        """Test que el header incluye la codificación hex por lotes (SSSE3)"""
+        codegen = TernaryBiMoTypeCodegen()
+        header = codegen.generate_header()
+
+        assert 'topology_to_hex16_batch' in header
+        assert '#ifdef __SSSE3__' in header
+        assert '_mm_shuffle_epi8' in header
+        assert 'topology_to_hex16_swar' in header
+
+    def test_header_has_signature_batch(self):
+        """Test que el header incluye la creación de firmas por lotes (AVX2)"""
+        codegen = TernaryBiMoTypeCodegen()
+        header = codegen.generate_header()
+
+        assert 'create_radioactive_signature_batch' in header
+        assert 'TernaryRadioactiveSignatureSoA' in header
+        assert '_mm256_permutevar8x32_ps' in header
+
     def test_header_has_isotope_names(self):
         """Test que el header contiene nombres de isótopos"""
         codegen = TernaryBiMoTypeCodegen()
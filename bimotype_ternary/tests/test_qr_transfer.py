@@ -50,3 +50,181 @@ def test_qr_image_generation():
     
     assert len(images) == len(qr_frames)
     assert images[0].size[0] > 0
+
+def test_qr_legacy_xor_payload_still_reconstructs():
+    """Payloads from the byte-by-byte XOR cipher remain readable."""
+    import base64
+    import zlib
+    
+    protocol = QRTransferProtocol(h7_index=42, chunk_size=10_000)
+    data = os.urandom(3000)
+    
+    compressed = zlib.compress(data)
+    keys = protocol.key_gen.generate_key_sequence(len(compressed))
+    legacy = bytes(compressed[i] ^ (int(abs(keys[i]) * 1000) % 256) for i in range(len(compressed)))
+    
+    assert protocol.reconstruct_payload({0: base64.b64encode(legacy).decode()}) == data
+
+def test_qr_payload_is_aes_ctr_with_fresh_nonce():
+    import base64
+    from bimotype_ternary.crypto.qr_transfer import QR_FORMAT_AES_CTR, QR_FORMAT_AES_CTR_ZSTD, ZSTD_AVAILABLE
+    
+    protocol = QRTransferProtocol(h7_index=42, chunk_size=10_000)
+    first = base64.b64decode(protocol.parse_qr_frame(protocol.prepare_payload(b"x" * 500, "a")[0])[3])
+    second = base64.b64decode(protocol.parse_qr_frame(protocol.prepare_payload(b"x" * 500, "a")[0])[3])
+    
+    assert first[0] == second[0] == (QR_FORMAT_AES_CTR_ZSTD if ZSTD_AVAILABLE else QR_FORMAT_AES_CTR)
+    assert first != second
+    
+    with pytest.raises(ValueError):
+        QRTransferProtocol(h7_index=41).reconstruct_payload({0: base64.b64encode(first).decode()})
+
+def test_qr_images_match_qrcode_render(monkeypatch):
+    """Frames rendered from the module matrix (serial or pooled) equal qrcode's own image."""
+    import numpy as np
+    import qrcode
+    import bimotype_ternary.crypto.qr_transfer as qr_transfer
+    
+    protocol = QRTransferProtocol(h7_index=42, chunk_size=300)
+    frames = protocol.prepare_payload(os.urandom(600), "blob.bin")
+    images = protocol.generate_qr_images(frames)
+    
+    qr = qrcode.QRCode(version=None, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4)
+    qr.add_data(frames[0])
+    qr.make(fit=True)
+    expected = qr.make_image(fill_color="black", back_color="white").get_image()
+    assert np.array_equal(np.asarray(images[0]), np.asarray(expected))
+    
+    monkeypatch.setattr(qr_transfer, "QR_POOL_MIN_FRAMES", 1)
+    pooled = protocol.generate_qr_images(frames)
+    assert all(np.array_equal(np.asarray(a), np.asarray(b)) for a, b in zip(images, pooled))
+
+def test_qr_images_fall_back_to_serial_without_pool(monkeypatch):
+    """If the process pool cannot start, frames are still encoded serially."""
+    import numpy as np
+    import bimotype_ternary.crypto.qr_transfer as qr_transfer
+    
+    protocol = QRTransferProtocol(h7_index=42, chunk_size=300)
+    frames = protocol.prepare_payload(os.urandom(600), "blob.bin")
+    images = protocol.generate_qr_images(frames)
+    
+    def no_pool(*args, **kwargs):
+        raise OSError("no process pool here")
+    
+    monkeypatch.setattr(qr_transfer, "QR_POOL_MIN_FRAMES", 1)
+    monkeypatch.setattr(qr_transfer, "ProcessPoolExecutor", no_pool)
+    serial = protocol.generate_qr_images(frames)
+    assert all(np.array_equal(np.asarray(a), np.asarray(b)) for a, b in zip(images, serial))
+
+def test_key_sequence_cache_slices_longest():
+    import numpy as np
+    
+    protocol = QRTransferProtocol(h7_index=7)
+    long_keys = protocol._key_sequence(500)
+    short_keys = protocol._key_sequence(120)
+    
+    assert len(protocol._key_cache) == 500
+    assert np.array_equal(short_keys, long_keys[:120])
+    assert np.array_equal(short_keys, protocol.key_gen.generate_key_sequence(120))
+
+def test_legacy_keystream_buffer_doubles():
+    import numpy as np
+    protocol = QRTransferProtocol(h7_index=42)
+    
+    assert len(protocol._ensure_keystream(100)) == 100
+    assert len(protocol._ensure_keystream(150)) == 150
+    assert len(protocol._keystream) == 200
+    
+    keys = protocol.key_gen.generate_key_sequence(150)
+    expected = np.array([int(abs(k) * 1000) % 256 for k in keys], dtype=np.uint8)
+    assert np.array_equal(protocol._ensure_keystream(150), expected)
+
+def test_capture_loop_keeps_latest_frames():
+    """The camera producer drops stale frames, ends with a None sentinel and releases the camera."""
+    import queue
+    import threading
+    from bimotype_ternary.crypto.qr_transfer import _capture_loop
+    
+    class FakeCamera:
+        def __init__(self):
+            self.n = 0
+            self.released = False
+        
+        def read(self):
+            self.n += 1
+            return self.n <= 20, self.n
+        
+        def release(self):
+            self.released = True
+    
+    frames = queue.Queue(maxsize=2)
+    camera = FakeCamera()
+    _capture_loop(camera, frames, threading.Event())
+    
+    assert frames.get_nowait() == 20
+    assert frames.get_nowait() is None
+    assert camera.released
+
+def test_prepare_scan_frame_downscales_to_gray():
+    import numpy as np
+    from bimotype_ternary.crypto.qr_transfer import _prepare_scan_frame, QR_SCAN_MAX_WIDTH
+    
+    hd = np.zeros((720, 1280, 3), dtype=np.uint8)
+    small = _prepare_scan_frame(hd)
+    assert small.shape == (360, QR_SCAN_MAX_WIDTH)
+    
+    vga = np.zeros((240, 320, 3), dtype=np.uint8)
+    assert _prepare_scan_frame(vga).shape == (240, 320)
+
+def test_qr_zstd_payload_without_zstandard_is_reported():
+    import base64
+    from bimotype_ternary.crypto import qr_transfer
+    
+    if qr_transfer.ZSTD_AVAILABLE:
+        pytest.skip("zstandard installed")
+    
+    protocol = QRTransferProtocol(h7_index=42)
+    nonce = os.urandom(qr_transfer.QR_CTR_NONCE_SIZE)
+    payload = bytes([qr_transfer.QR_FORMAT_AES_CTR_ZSTD]) + nonce + qr_transfer._aes_ctr(
+        protocol._aes_key(), nonce, b"\x28\xb5\x2f\xfd" + os.urandom(32)
+    )
+    
+    with pytest.raises(ValueError, match="zstandard"):
+        protocol.reconstruct_payload({0: base64.b64encode(payload).decode()})
+
+def test_parse_qr_frame_str_and_bytes():
+    protocol = QRTransferProtocol(h7_index=42, chunk_size=40)
+    data = os.urandom(500)
+    frames = protocol.prepare_payload(data, "doc.bin")
+    
+    parsed = [protocol.parse_qr_frame(f.encode("ascii")) for f in frames]
+    assert all(isinstance(p[3], bytes) for p in parsed)
+    assert [p[:3] for p in parsed] == [protocol.parse_qr_frame(f)[:3] for f in frames]
+    assert protocol.reconstruct_payload({p[1]: p[3] for p in parsed}) == data
+    
+    assert protocol.parse_qr_frame("BIMO_QR|a|x|2|abc") is None
+    assert protocol.parse_qr_frame(b"OTHER|a|0|1|abc") is None
+    assert protocol.parse_qr_frame("BIMO_QR|a|0|1|ab|c") == ("a", 0, 1, "ab|c")
+
+def test_qr_animation_is_single_apng():
+    from io import BytesIO
+    from PIL import Image
+    protocol = QRTransferProtocol(h7_index=42, chunk_size=100)
+    frames = protocol.prepare_payload(os.urandom(600), "anim.bin")
+    
+    apng = protocol.generate_qr_animation(frames)
+    with Image.open(BytesIO(apng)) as img:
+        assert img.format == "PNG"
+        assert img.n_frames == len(frames)
+        assert img.size[0] == max(i.size[0] for i in protocol.generate_qr_images(frames))
+    assert protocol.generate_qr_animation([]) == b""
+
+def test_iter_qr_images_is_lazy_and_matches_list():
+    import types
+    protocol = QRTransferProtocol(h7_index=42, chunk_size=100)
+    frames = protocol.prepare_payload(os.urandom(400), "lazy.bin")
+    
+    stream = protocol.iter_qr_images(frames)
+    assert isinstance(stream, types.GeneratorType)
+    streamed = [img.tobytes() for img in stream]
+    assert streamed == [img.tobytes() for img in protocol.generate_qr_images(frames)]
@@ -13,6 +13,7 @@ import pytest
 from bimotype_ternary.topology import (
     CodificadorTopologicoBigEndian,
     CodificadorHexadecimalBigEndian,
+    TopologicalStateArray,
     generar_tabla_topologica_completa
 )
 
@@ -105,6 +106,23 @@ class TestEmpaquetamientoTopologico:
                 fase_discreta_fragmento=0
             )
 
+    
+    def test_empaquetar_lote_soa(self):
+        """Test empaquetamiento en lote (SoA) igual al escalar"""
+        entries = CodificadorTopologicoBigEndian.topology_entries * 3
+        packed = TopologicalStateArray.from_entries(entries).pack()
+        
+        assert len(packed) == len(entries)
+        for entry, value in zip(entries, packed.tolist()):
+            assert value == CodificadorTopologicoBigEndian.empaquetar_topologia(
+                entry['indice'],
+                entry['pareja'],
+                entry['winding'],
+                entry['mapeo'],
+                entry['peso_ternario'],
+                entry['fase_discreta_fragmento']
+            )
+
 
 class TestCodificacionHexadecimal:
     """Tests de codificación hexadecimal"""
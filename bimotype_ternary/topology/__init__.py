@@ -1,11 +1,13 @@
 from .encoder import (
     CodificadorTopologicoBigEndian,
     CodificadorHexadecimalBigEndian,
+    TopologicalStateArray,
     generar_tabla_topologica_completa
 )
 
 __all__ = [
     'CodificadorTopologicoBigEndian',
     'CodificadorHexadecimalBigEndian',
+    'TopologicalStateArray',
     'generar_tabla_topologica_completa'
 ]
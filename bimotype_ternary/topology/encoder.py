@@ -16,6 +16,7 @@ Autor: Jacobo Tlacaelel Mina Rodriguez
 """
 
 import numpy as np
+from dataclasses import dataclass
 from typing import Dict, List, Tuple, Optional
 
 
@@ -195,6 +196,89 @@ class CodificadorTopologicoBigEndian:
         return cls.topology_entries[index].copy()
 
 
+# ============================================================================
+# ESTADOS TOPOLÓGICOS EN COLUMNAS (SoA)
+# ============================================================================
+
+@dataclass
+class TopologicalStateArray:
+    """
+    Lote de estados topológicos en formato columnar (SoA).
+    
+    Un arreglo NumPy por campo, con el mismo layout que espera
+    `topology_pack_soa` en el header C generado.
+    """
+    indice: np.ndarray                   # uint8
+    pareja: np.ndarray                   # uint8
+    winding: np.ndarray                  # uint8
+    mapeo: np.ndarray                    # uint8
+    peso_ternario: np.ndarray            # int8
+    fase_discreta_fragmento: np.ndarray  # uint8
+    
+    @classmethod
+    def from_entries(cls, entries: List[Dict]) -> 'TopologicalStateArray':
+        """
+        Construye el lote desde una lista de estados (AoS).
+        
+        Args:
+            entries: Lista de dicts con los 6 campos topológicos
+        
+        Returns:
+            TopologicalStateArray con una columna por campo
+        """
+        n = len(entries)
+        
+        def column(field: str, dtype) -> np.ndarray:
+            return np.fromiter((e[field] for e in entries), dtype=dtype, count=n)
+        
+        return cls(
+            indice=column('indice', np.uint8),
+            pareja=column('pareja', np.uint8),
+            winding=column('winding', np.uint8),
+            mapeo=column('mapeo', np.uint8),
+            peso_ternario=column('peso_ternario', np.int8),
+            fase_discreta_fragmento=column('fase_discreta_fragmento', np.uint8)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.indice)
+    
+    def pack(self) -> np.ndarray:
+        """
+        Empaqueta todos los estados en uint16 (big-endian) en una sola pasada.
+        
+        Mismo layout de bits que `CodificadorTopologicoBigEndian.empaquetar_topologia`.
+        
+        Returns:
+            np.ndarray de uint16 con un valor empaquetado por estado
+        """
+        indice = self.indice.astype(np.uint16)
+        pareja = self.pareja.astype(np.uint16)
+        winding = self.winding.astype(np.uint16)
+        mapeo = self.mapeo.astype(np.uint16)
+        peso = self.peso_ternario.astype(np.int16)
+        fase = self.fase_discreta_fragmento.astype(np.uint16)
+        
+        # Validaciones
+        assert np.all((indice >= 1) & (indice <= 6)), "indice debe estar en [1, 6]"
+        assert np.all((pareja >= 1) & (pareja <= 6)), "pareja debe estar en [1, 6]"
+        assert np.all((winding == 0) | (winding == 2)), "winding debe ser 0 o 2"
+        assert np.all(mapeo <= 1), "mapeo debe ser 0 o 1"
+        assert np.all((peso >= -1) & (peso <= 1)), "peso_ternario debe ser -1, 0, o 1"
+        assert np.all(fase <= 7), "fase debe estar en [0, 7]"
+        
+        peso_encoded = (peso + 1).astype(np.uint16)
+        
+        packed = (indice & 0x7) << 13
+        packed |= (pareja & 0x7) << 10
+        packed |= ((winding >> 1) & 0x3) << 8
+        packed |= (mapeo & 0x1) << 7
+        packed |= (peso_encoded & 0x3) << 5
+        packed |= fase & 0x1F
+        
+        return packed
+
+
 # ============================================================================
 # CODIFICADOR HEXADECIMAL
 # ============================================================================
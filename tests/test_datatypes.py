@@ -1,6 +1,7 @@
+import dataclasses
 import pytest
 import numpy as np
-from bimotype_ternary.core.datatypes import TipoDecaimiento, FirmaRadiactiva, EstadoCuantico, PaqueteBiMoType, crear_firma_desde_isotopo
+from bimotype_ternary.core.datatypes import TipoDecaimiento, FirmaRadiactiva, FirmaRadiactivaArray, EstadoCuantico, EstadoCuanticoArray, PaqueteBiMoType, crear_firma_desde_isotopo, isotopos_por_decaimiento
 
 def test_tipo_decaimiento_str():
     assert str(TipoDecaimiento.BETA) == "BETA"
@@ -33,6 +34,25 @@ def test_estado_cuantico_normalization():
     with pytest.raises(ValueError):
         EstadoCuantico(alpha=1.0, beta=1.0)
 
+def test_estado_cuantico_array():
+    estados = [
+        EstadoCuantico(alpha=1/np.sqrt(2), beta=-1/np.sqrt(2)),
+        EstadoCuantico(alpha=0.0, beta=1.0),
+        EstadoCuantico(alpha=0.6, beta=0.8j),
+    ]
+    lote = EstadoCuanticoArray.from_estados(estados)
+    assert len(lote) == 3
+    np.testing.assert_allclose(lote.phase, [e.phase for e in estados])
+    np.testing.assert_allclose(lote.probability_0, [e.probability_0 for e in estados])
+    np.testing.assert_allclose(lote.probability_1, [e.probability_1 for e in estados])
+
+def test_estado_cuantico_phase_complex64():
+    estado = EstadoCuantico(alpha=np.complex64(0.6), beta=np.complex64(0.8j))
+    assert estado.phase == pytest.approx(np.pi / 2)
+    assert [f.name for f in dataclasses.fields(estado)] == ['alpha', 'beta']
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        estado.alpha = 1.0
+
 def test_crear_firma_desde_isotopo():
     firma = crear_firma_desde_isotopo("Sr90")
     assert firma.isotope == "Sr90"
@@ -53,6 +73,23 @@ def test_crear_firma_desde_isotopo():
     with pytest.raises(ValueError):
         crear_firma_desde_isotopo("IsotopoInexistente")
 
+def test_isotopos_por_decaimiento():
+    assert isotopos_por_decaimiento(TipoDecaimiento.BETA) == ["Sr90", "H3"]
+    assert isotopos_por_decaimiento(TipoDecaimiento.STABLE) == ["H1", "H2"]
+
+def test_firma_radiactiva_array_batch():
+    firmas = [crear_firma_desde_isotopo(iso) for iso in ("Sr90", "Tc99m", "H1")]
+    lote = FirmaRadiactivaArray.from_firmas(firmas)
+    assert len(lote) == 3
+    
+    columnas = lote.to_dict_batch()
+    assert columnas['isotope'] == ["Sr90", "Tc99m", "H1"]
+    assert columnas['decay_type'] == ["BETA", "GAMMA", "STABLE"]
+    
+    copia = FirmaRadiactivaArray.from_records(columnas)
+    assert copia[1] == firmas[1]
+    assert len(lote[1:]) == 2
+
 def test_paquete_bimo_type():
     estado = EstadoCuantico(alpha=1.0, beta=0.0)
     paquete = PaqueteBiMoType(
@@ -68,3 +105,8 @@ def test_paquete_bimo_type():
     
     d = paquete.to_dict()
     assert d['quantum_states'][0]['prob_0'] == 1.0
+    
+    # Lista mixta: objetos y dicts ya serializados
+    paquete.quantum_states = [estado, estado.to_dict()]
+    d = paquete.to_dict()
+    assert d['quantum_states'][0] == d['quantum_states'][1]
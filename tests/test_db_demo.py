@@ -4,11 +4,16 @@ from bimotype_ternary.core.session_manager import SessionManager
 from bimotype_ternary.database.manager import DatabaseManager
 from bimotype_ternary.database.models import IdentityMetrics, AuditLog
 
+def _remove_db(db_file):
+    """Borra la base SQLite y sus ficheros WAL."""
+    for path in (db_file, db_file + "-wal", db_file + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
 def test_db_session_lifecycle():
     """Valida el ciclo de vida de una sesión y su persistencia."""
     db_file = "test_temp.sqlite3"
-    if os.path.exists(db_file):
-        os.remove(db_file)
+    _remove_db(db_file)
         
     try:
         sm = SessionManager(db_path=db_file)
@@ -34,14 +39,12 @@ def test_db_session_lifecycle():
         
         session.close()
     finally:
-        if os.path.exists(db_file):
-            os.remove(db_file)
+        _remove_db(db_file)
 
 def test_database_manager_identity():
     """Valida el registro de identidad con el Operador Áureo."""
     db_file = "test_identity.sqlite3"
-    if os.path.exists(db_file):
-        os.remove(db_file)
+    _remove_db(db_file)
         
     try:
         db_mgr = DatabaseManager(db_file)
@@ -60,5 +63,59 @@ def test_database_manager_identity():
         
         session.close()
     finally:
-        if os.path.exists(db_file):
-            os.remove(db_file)
+        _remove_db(db_file)
+
+def test_database_manager_bulk_audit():
+    """Valida la inserción de auditoría en lote."""
+    db_file = "test_bulk_audit.sqlite3"
+    _remove_db(db_file)
+        
+    try:
+        db_mgr = DatabaseManager(db_file)
+        fingerprint = "test_fingerprint_bulk"
+        record = db_mgr.create_session_record(1, fingerprint)
+        
+        db_mgr.add_audit_logs([
+            {'fingerprint': fingerprint, 'event_type': "PWD_GEN", 'description': f"evento {i}"}
+            for i in range(5)
+        ])
+        db_mgr.add_audit_logs([])
+        db_mgr.add_audit_log("desconocido", "PWD_GEN", "sin sesión")
+        
+        session = db_mgr.get_session()
+        logs = session.query(AuditLog).filter_by(event_type="PWD_GEN").all()
+        
+        assert len(logs) == 6
+        assert sum(log.session_id == record.id for log in logs) == 5
+        assert sum(log.session_id is None for log in logs) == 1
+        
+        session.close()
+    finally:
+        _remove_db(db_file)
+
+def test_database_manager_shared_session():
+    """Varias operaciones en una sola transacción: todo o nada."""
+    db_file = "test_shared_session.sqlite3"
+    _remove_db(db_file)
+        
+    try:
+        db_mgr = DatabaseManager(db_file)
+        
+        with db_mgr.session() as db:
+            record = db_mgr.create_session_record(1, "fp_ok", db=db)
+            db_mgr.add_audit_log("fp_ok", "SESSION_START", "ok", db=db)
+        assert record.id is not None
+        
+        with pytest.raises(RuntimeError):
+            with db_mgr.session() as db:
+                db_mgr.create_session_record(2, "fp_fail", db=db)
+                db_mgr.add_audit_log("fp_fail", "SESSION_START", "fail", db=db)
+                raise RuntimeError("abort")
+        
+        session = db_mgr.get_session()
+        logs = session.query(AuditLog).all()
+        assert [log.description for log in logs] == ["ok"]
+        assert logs[0].session_id == record.id
+        session.close()
+    finally:
+        _remove_db(db_file)
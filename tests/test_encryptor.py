@@ -0,0 +1,186 @@
+import os
+import pytest
+from bimotype_ternary.crypto.encryptor import QuantumEncryptor, EncryptedPacket
+from bimotype_ternary.crypto.key_derivation import QuantumKeyDerivation, SUPPORTED_KDFS, DEFAULT_ITERATIONS
+
+@pytest.mark.parametrize("kdf", SUPPORTED_KDFS)
+def test_encrypt_decrypt_roundtrip(kdf):
+    enc = QuantumEncryptor(iterations=1000, kdf=kdf)
+    packet = enc.encrypt(b"mensaje cuantico", "clave-secreta")
+    assert packet.metadata['kdf'] == kdf
+    
+    # El descifrado elige el KDF desde la metadata del paquete
+    other = QuantumEncryptor(iterations=1000)
+    assert other.decrypt(packet, "clave-secreta") == b"mensaje cuantico"
+    
+    with pytest.raises(ValueError):
+        other.decrypt(packet, "clave-incorrecta")
+
+def test_decrypt_legacy_packet_without_kdf():
+    enc = QuantumEncryptor(iterations=1000, kdf="pbkdf2-sha512")
+    packet = enc.encrypt(b"legacy", "clave")
+    del packet.metadata['kdf']
+    assert QuantumEncryptor(iterations=1000).decrypt(packet, "clave") == b"legacy"
+
+def test_iterations_follow_kdf_and_metadata():
+    assert QuantumEncryptor().iterations == DEFAULT_ITERATIONS["pbkdf2-sha256"]
+    assert QuantumEncryptor(kdf="pbkdf2-sha512").iterations == DEFAULT_ITERATIONS["pbkdf2-sha512"]
+    
+    packet = QuantumEncryptor(iterations=1000).encrypt(b"iter", "clave")
+    assert packet.metadata['iterations'] == 1000
+    # El descifrado usa las iteraciones del paquete, no las de la instancia
+    assert QuantumEncryptor(iterations=5).decrypt(packet, "clave") == b"iter"
+    
+    # Paquetes anteriores sin 'iterations': valor del llamador
+    del packet.metadata['iterations']
+    assert QuantumEncryptor(iterations=1000).decrypt(packet, "clave") == b"iter"
+
+def test_unknown_kdf():
+    with pytest.raises(ValueError):
+        QuantumEncryptor(kdf="md5")
+
+def test_derive_key_cache_and_expansion():
+    kdf = QuantumKeyDerivation()
+    k1 = kdf.derive_key("clave", iterations=1000)
+    assert kdf.derive_key("clave", iterations=1000) is k1
+    assert kdf.derive_key("otra", iterations=1000) != k1
+    
+    keys = kdf.derive_expanded_keys("clave", 4, key_length=16, iterations=1000)
+    assert len(keys) == 4 and len(set(keys)) == 4
+    assert all(len(k) == 16 for k in keys)
+
+def test_derive_expanded_keys_known_answer():
+    keys = QuantumKeyDerivation().derive_expanded_keys("clave", 3, key_length=16, iterations=1000)
+    assert [k.hex() for k in keys] == [
+        "e510ef54785a5f7f6c1e8a444d4fb80b",
+        "8460cfd14386af06018f95b76c7acad5",
+        "9b8a2565de689fe5f17f306afcd44b05",
+    ]
+    
+    with pytest.raises(ValueError):
+        QuantumKeyDerivation().derive_expanded_keys("clave", 256, key_length=32, iterations=1000)
+
+@pytest.mark.parametrize("size", [0, 10, 200000])
+def test_encrypt_decrypt_file(tmp_path, size):
+    data = os.urandom(size)
+    src, enc_path, out = tmp_path / "in.bin", tmp_path / "in.qc", tmp_path / "out.bin"
+    src.write_bytes(data)
+    
+    enc = QuantumEncryptor(iterations=1000)
+    enc.encrypt_file(str(src), str(enc_path), "clave")
+    enc.decrypt_file(str(enc_path), str(out), "clave")
+    assert out.read_bytes() == data
+
+def test_encrypt_decrypt_file_in_place(tmp_path):
+    data = os.urandom(100000)
+    path = tmp_path / "data.bin"
+    path.write_bytes(data)
+    
+    enc = QuantumEncryptor(iterations=1000)
+    enc.encrypt_file(str(path), str(path), "clave")
+    assert path.read_bytes()[:4] == b"QCRY"
+    enc.decrypt_file(str(path), str(path), "clave")
+    assert path.read_bytes() == data
+
+def test_decrypt_file_wrong_password_keeps_output(tmp_path):
+    src, enc_path, out = tmp_path / "in.bin", tmp_path / "in.qc", tmp_path / "out.bin"
+    src.write_bytes(b"secreto" * 1000)
+    out.write_bytes(b"existente")
+    
+    enc = QuantumEncryptor(iterations=1000)
+    enc.encrypt_file(str(src), str(enc_path), "clave")
+    with pytest.raises(ValueError):
+        enc.decrypt_file(str(enc_path), str(out), "incorrecta")
+    
+    # Ni se borra la salida previa ni quedan temporales con texto plano
+    assert out.read_bytes() == b"existente"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["in.bin", "in.qc", "out.bin"]
+
+def test_binary_container_roundtrip(tmp_path):
+    enc = QuantumEncryptor(iterations=1000)
+    packet = enc.encrypt(b"contenedor", "clave")
+    
+    data = packet.to_bytes()
+    assert data[:4] == b"QCRY"
+    assert EncryptedPacket.from_bytes(data) == packet
+    
+    # Los archivos JSON heredados se siguen descifrando
+    legacy, out = tmp_path / "legacy.json", tmp_path / "out.bin"
+    legacy.write_bytes(packet.to_json_bytes())
+    enc.decrypt_file(str(legacy), str(out), "clave")
+    assert out.read_bytes() == b"contenedor"
+    assert EncryptedPacket.from_json(packet.to_json()) == packet
+
+def test_truncated_container_raises_value_error(tmp_path):
+    enc = QuantumEncryptor(iterations=1000)
+    data = enc.encrypt_to_bytes(b"contenedor", "clave")
+    header_end = 8 + int.from_bytes(data[4:8], "little")
+    
+    # Prefijo cortado, cabecera cortada, nonce/salt cortados, cabecera sin campos
+    malformed = [data[:6], data[:header_end - 1], data[:header_end + 20],
+                 b"QCRY" + (2).to_bytes(4, "little") + b"{}"]
+    for blob in malformed:
+        with pytest.raises(ValueError, match="Invalid container"):
+            enc.decrypt_from_bytes(blob, "clave")
+        with pytest.raises(ValueError, match="Invalid container"):
+            EncryptedPacket.from_bytes(blob)
+    
+    path, out = tmp_path / "trunc.qc", tmp_path / "out.bin"
+    path.write_bytes(data[:6])
+    with pytest.raises(ValueError, match="Invalid container"):
+        enc.decrypt_file(str(path), str(out), "clave")
+
+def test_decrypt_file_wrong_password(tmp_path):
+    src, enc_path, out = tmp_path / "in.bin", tmp_path / "in.qc", tmp_path / "out.bin"
+    src.write_bytes(os.urandom(100000))
+    
+    enc = QuantumEncryptor(iterations=1000)
+    enc.encrypt_file(str(src), str(enc_path), "clave")
+    with pytest.raises(ValueError):
+        enc.decrypt_file(str(enc_path), str(out), "incorrecta")
+    assert not out.exists()
+    
+    # Un paquete en memoria (AESGCM) se descifra por la ruta incremental
+    enc_path.write_bytes(enc.encrypt(b"en memoria", "clave").to_bytes())
+    enc.decrypt_file(str(enc_path), str(out), "clave")
+    assert out.read_bytes() == b"en memoria"
+
+def test_verify_signature_fields():
+    enc = QuantumEncryptor(iterations=1000)
+    metadata = {
+        'isotope': 'Sr90', 'decay_type': 'beta', 'h7_index': 3, 'h7_pair': 4,
+        'quantum_phase': 0.0, 'mg_polarity': 1, 'topology_state_index': 2
+    }
+    packet = EncryptedPacket("", "", "", metadata, 0.0)
+    assert enc.verify_signature(packet)
+    
+    packet.metadata = {**metadata, 'isotope': 'U235'}
+    assert not enc.verify_signature(packet)
+    
+    packet.metadata = {k: v for k, v in metadata.items() if k != 'mg_polarity'}
+    assert not enc.verify_signature(packet)
+
+def test_encrypt_to_bytes_roundtrip():
+    enc = QuantumEncryptor(iterations=1000)
+    data = enc.encrypt_to_bytes(b"registro", "clave", b"aad")
+    assert data[:4] == b"QCRY"
+    assert enc.decrypt_from_bytes(data, "clave", b"aad") == b"registro"
+    
+    packet = EncryptedPacket.from_bytes(data)
+    assert enc.decrypt(packet, "clave", b"aad") == b"registro"
+    
+    with pytest.raises(ValueError):
+        enc.decrypt_from_bytes(data, "otra", b"aad")
+
+def test_encrypt_many_shares_key_and_aead():
+    enc = QuantumEncryptor(iterations=1000)
+    messages = [b"uno", b"dos", b"tres"]
+    packets = enc.encrypt_many(messages, "clave")
+    
+    assert len({p.salt for p in packets}) == 1
+    assert len({p.nonce for p in packets}) == 3
+    assert [enc.decrypt(p, "clave") for p in packets] == messages
+    assert len(enc._aead_cache) == 1
+    
+    with pytest.raises(ValueError):
+        enc.decrypt(packets[0], "otra")
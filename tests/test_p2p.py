@@ -82,3 +82,27 @@ def test_peer_discovery():
     resolved = PeerDiscovery.resolve_peer(fp)
     assert resolved == ("1.2.3.4", 9999)
     print("Peer Discovery Test Passed!")
+
+def test_peer_discovery_cache_follows_file(tmp_path, monkeypatch):
+    import json
+    import os
+    path = tmp_path / "peers.json"
+    monkeypatch.setattr(PeerDiscovery, "CACHE_FILE", str(path))
+    monkeypatch.setattr(PeerDiscovery, "_cache", {})
+    monkeypatch.setattr(PeerDiscovery, "_cache_stamp", None)
+    
+    assert PeerDiscovery.get_all_peers() == {}
+    PeerDiscovery.register_peer("fp_a", "10.0.0.1", 7000)
+    assert PeerDiscovery.resolve_peer("fp_a") == ("10.0.0.1", 7000)
+    
+    # Another process rewrites the file: the new contents are picked up
+    path.write_text(json.dumps({"fp_b": {"host": "10.0.0.2", "port": 7001}}))
+    os.utime(path, ns=(0, 1))
+    assert set(PeerDiscovery.get_all_peers()) == {"fp_b"}
+    
+    # Same mtime and size under another path: the stamp includes the path
+    other = tmp_path / "other.json"
+    other.write_text(json.dumps({"fp_c": {"host": "10.0.0.3", "port": 7001}}))
+    os.utime(other, ns=(0, 1))
+    monkeypatch.setattr(PeerDiscovery, "CACHE_FILE", str(other))
+    assert set(PeerDiscovery.get_all_peers()) == {"fp_c"}
@@ -0,0 +1,67 @@
+import pytest
+from bimotype_ternary.crypto.password_generator import QuantumPasswordGenerator
+
+
+@pytest.fixture(scope="module")
+def gen():
+    return QuantumPasswordGenerator()
+
+def test_generate_length_and_charset(gen):
+    pwd = gen.generate(length=24, charset='digits')
+    assert len(pwd) == 24
+    assert set(pwd) <= set(QuantumPasswordGenerator.CHARSET_DIGITS)
+    
+    with pytest.raises(ValueError):
+        gen.generate(length=3)
+
+def test_generate_with_seed_is_deterministic(gen):
+    a = gen.generate_with_seed("semilla", length=20)
+    assert a == gen.generate_with_seed("semilla", length=20)
+    assert a != gen.generate_with_seed("otra semilla", length=20)
+    assert len(a) == 20
+    assert set(gen.generate_with_seed("semilla", length=50, charset='lowercase')) <= set(
+        QuantumPasswordGenerator.CHARSET_LOWERCASE
+    )
+
+def test_analyze_strength_char_types(gen):
+    report = gen.analyze_strength("abcXYZ")
+    assert report['has_lowercase'] and report['has_uppercase']
+    assert not report['has_digits'] and not report['has_symbols']
+    assert report['charset_size'] == 52
+    
+    assert QuantumPasswordGenerator._char_types("a1!") == (True, False, True, True)
+
+def test_generate_long_and_unicode_charsets(gen):
+    pwd = gen.generate(length=200, charset='lowercase')
+    assert len(pwd) == 200
+    assert set(pwd) <= set(QuantumPasswordGenerator.CHARSET_LOWERCASE)
+    
+    pwd = gen.generate(length=12, charset='αβγδ')
+    assert len(pwd) == 12
+    assert set(pwd) <= set('αβγδ')
+
+def test_estimate_entropy_table_matches_formula(gen):
+    import math
+    from collections import Counter
+    from bimotype_ternary.crypto.password_generator import PLOG2P_MAX_LENGTH
+    
+    def reference(pwd):
+        n = len(pwd)
+        return -sum((c / n) * math.log2(c / n) for c in Counter(pwd).values()) * n
+    
+    for pwd in ("aaaa", "abcd", "aabbbc!!", gen.generate(length=40), "xy" * (PLOG2P_MAX_LENGTH + 3)):
+        assert gen.estimate_entropy(pwd) == pytest.approx(reference(pwd))
+    assert gen.estimate_entropy("") == 0.0
+    assert gen.estimate_entropy("aaaa") == 0.0
+
+def test_generate_batch_complexity(gen):
+    batch = gen.generate_batch(500, length=8)
+    assert len(batch) == 500
+    assert all(len(pwd) == 8 for pwd in batch)
+    assert all(QuantumPasswordGenerator._char_types(pwd) == (True, True, True, True) for pwd in batch)
+    
+    assert set(''.join(gen.generate_batch(10, length=12, charset='digits'))) <= set(
+        QuantumPasswordGenerator.CHARSET_DIGITS
+    )
+    assert all(set(pwd) <= set('αβγδ') for pwd in gen.generate_batch(3, length=6, charset='αβγδ'))
+    assert gen.generate_batch(0) == []
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from bimotype_ternary.core import recursive_engine
+from bimotype_ternary.core.recursive_engine import RecursiveEngine, BLEND_ARRAY_MIN_KEYS
+
+def test_blend_numeric_numba_matches_numpy():
+    pytest.importorskip("numba")
+    rng = np.random.default_rng(3)
+    prev, curr = rng.standard_normal(1000), rng.standard_normal(1000)
+    np.testing.assert_allclose(
+        recursive_engine._blend_numeric_numba(prev, curr),
+        recursive_engine._blend_numeric_numpy(prev, curr),
+        rtol=1e-15
+    )
+
+@pytest.mark.parametrize("n_keys", [2, BLEND_ARRAY_MIN_KEYS + 5])
+def test_compute_feedback_loop_blend(tmp_path, monkeypatch, n_keys):
+    engine = RecursiveEngine(db_path=str(tmp_path / "engine.sqlite3"))
+    prev = {f"k{i}": float(i) for i in range(n_keys)}
+    prev["label"] = "old"
+    monkeypatch.setattr(engine, "load_previous_feedback", lambda: {"data": prev})
+    
+    current = {f"k{i}": i + 10 for i in range(n_keys)}
+    current.update(label="new", extra=1.5)
+    evolved = engine.compute_feedback_loop(current)
+    
+    # Shared numeric keys are blended; everything else is overwritten
+    assert evolved == {
+        **{f"k{i}": (i * 0.7) + ((i + 10) * 0.3) for i in range(n_keys)},
+        "label": "new",
+        "extra": 1.5,
+    }
+    assert all(type(evolved[f"k{i}"]) is float for i in range(n_keys))